@@ -8,3 +8,74 @@ MODEL = "openai/gpt-oss-120b"
 
 if not GROQ_API_KEY:
     raise RuntimeError("GROQ_API_KEY not set")
+
+# LLM client limits (defaults match the Groq free tier)
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "8000"))
+LLM_EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "512"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "10"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+
+# Resume ranking models
+EMBED_MODEL_NAME = os.getenv("EMBED_MODEL_NAME", "sentence-transformers/all-mpnet-base-v2")
+CROSS_MODEL_NAME = os.getenv("CROSS_MODEL_NAME", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+BI_ENCODER_BATCH_SIZE = int(os.getenv("BI_ENCODER_BATCH_SIZE", "64"))
+CROSS_ENCODER_BATCH_SIZE = int(os.getenv("CROSS_ENCODER_BATCH_SIZE", "32"))
+CROSS_ENCODER_CHUNKS_PER_CANDIDATE = int(os.getenv("CROSS_ENCODER_CHUNKS_PER_CANDIDATE", "3"))
+CROSS_ENCODER_MAX_TOKENS = int(os.getenv("CROSS_ENCODER_MAX_TOKENS", "512"))
+CROSS_ENCODER_JD_TOKENS = int(os.getenv("CROSS_ENCODER_JD_TOKENS", "192"))
+LLM_SUMMARY_WORKERS = int(os.getenv("LLM_SUMMARY_WORKERS", "4"))
+WARMUP_MODELS_ON_STARTUP = os.getenv("WARMUP_MODELS_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")  # "torch" or "onnx"
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join("models", "onnx"))
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))  # 0 lets ONNX Runtime decide
+
+# Google Drive
+DRIVE_DOWNLOAD_WORKERS = int(os.getenv("DRIVE_DOWNLOAD_WORKERS", "8"))
+
+# Resume text extraction
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+EXTRACT_TIMEOUT_SECONDS = int(os.getenv("EXTRACT_TIMEOUT_SECONDS", "10"))
+PDF_EXTRACTOR_ORDER = os.getenv("PDF_EXTRACTOR_ORDER", "pymupdf,pypdf,pdfminer")  # cheapest first
+EXTRACT_ENOUGH_CHARS = int(os.getenv("EXTRACT_ENOUGH_CHARS", "20000"))  # stop parsing pages past this much text
+
+# OCR of image-only resume pages (own process pool and time budget)
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+OCR_TIMEOUT_SECONDS = int(os.getenv("OCR_TIMEOUT_SECONDS", "60"))
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "10"))
+
+# Ranking pipeline (download -> extract -> section -> embed -> cross-score)
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "16"))
+PIPELINE_SECTION_WORKERS = int(os.getenv("PIPELINE_SECTION_WORKERS", "2"))
+PIPELINE_FLUSH_SECONDS = float(os.getenv("PIPELINE_FLUSH_SECONDS", "0.5"))
+
+# Persistent data
+DATA_DIR = os.getenv("DATA_DIR", "data")
+JD_STORE_BACKEND = os.getenv("JD_STORE_BACKEND", "sqlite")  # "sqlite" or "memory"
+JD_DB_PATH = os.getenv("JD_DB_PATH", os.path.join(DATA_DIR, "jds.sqlite3"))
+JD_DB_POOL_SIZE = int(os.getenv("JD_DB_POOL_SIZE", "4"))
+JD_VERSION_SNAPSHOT_INTERVAL = int(os.getenv("JD_VERSION_SNAPSHOT_INTERVAL", "10"))
+
+# JD file uploads (/jd/extract/file)
+JD_PARSE_WORKERS = int(os.getenv("JD_PARSE_WORKERS", "2"))
+JD_UPLOAD_MAX_MB = int(os.getenv("JD_UPLOAD_MAX_MB", "20"))
+
+# Ranking jobs
+RANKING_JOB_DB_PATH = os.getenv("RANKING_JOB_DB_PATH", os.path.join(DATA_DIR, "ranking_jobs.sqlite3"))
+RANKING_JOB_WORKERS = int(os.getenv("RANKING_JOB_WORKERS", "2"))
+
+# Talent pool
+TALENT_POOL_DB_PATH = os.getenv("TALENT_POOL_DB_PATH", os.path.join(DATA_DIR, "talent_pool.sqlite3"))
+TALENT_POOL_INDEX_DIR = os.getenv("TALENT_POOL_INDEX_DIR", os.path.join(DATA_DIR, "talent_pool_index"))
+TALENT_POOL_NLIST = int(os.getenv("TALENT_POOL_NLIST", "256"))
+TALENT_POOL_NPROBE = int(os.getenv("TALENT_POOL_NPROBE", "16"))
+
+# Local caches
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+RESUME_TEXT_CACHE_MAX_MB = int(os.getenv("RESUME_TEXT_CACHE_MAX_MB", "256"))
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "64"))
+OCR_CACHE_MAX_MB = int(os.getenv("OCR_CACHE_MAX_MB", "64"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+EMBED_STORE_DTYPE = os.getenv("EMBED_STORE_DTYPE", "float32")  # or float16 to halve disk use
@@ -35,15 +35,29 @@ except Exception:
     # best-effort: if typing API changed we skip shim
     pass
 
+import logging
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from app.config import WARMUP_MODELS_ON_STARTUP
 from app.routes.jd_routes import router as jd_router
+from app.routes.talent_pool_routes import router as talent_pool_router
+from app.services.jd_documents import UploadSizeLimit
+from app.services.model_registry import warmup_models, get_model_stats
+from app.services.pdf_extraction import get_extraction_stats
+from app.services.ranking_jobs import resume_pending_jobs
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Agentic Recruitment Backend",
     version="1.0.0"
 )
 
+# Turn away oversized JD uploads before they are spooled; added before CORS
+# so the 413 still carries CORS headers
+app.add_middleware(UploadSizeLimit, paths=("/jd/extract/file",))
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -51,10 +65,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 app.include_router(jd_router)
+app.include_router(talent_pool_router)
+
+
+@app.on_event("startup")
+async def warmup_ranking_models():
+    if not WARMUP_MODELS_ON_STARTUP:
+        return
+    try:
+        stats = await run_in_threadpool(warmup_models)
+        logger.info(f"Ranking models warmed up: {stats}")
+    except Exception as e:
+        # Models still load lazily on the first ranking request
+        logger.error(f"Model warmup failed: {str(e)}")
+
+
+@app.on_event("startup")
+def resume_ranking_jobs():
+    resume_pending_jobs()
+
 
 @app.get("/")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/health/models")
+def model_health():
+    return get_model_stats()
+
+
+@app.get("/health/extraction")
+def extraction_health():
+    return get_extraction_stats()
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, conint
 from typing import List, Optional, Dict
 from datetime import datetime
 
@@ -23,7 +23,8 @@ class JDResponse(BaseModel):
     status: str
     fields: JDFields
     jd_text: str
-    versions: List[Dict]
+    version_count: int
+    versions: Optional[List["JDVersion"]] = None  # only with include_versions=true (deprecated)
     created_at: datetime
     updated_at: datetime
 
@@ -58,6 +59,17 @@ class JDVersion(BaseModel):
     jd_text: str
 
 
+JDResponse.update_forward_refs()
+
+
+class JDVersionPage(BaseModel):
+    jd_id: str
+    total: int
+    offset: int
+    limit: int
+    versions: List[JDVersion]
+
+
 class ResumeRankingRequest(BaseModel):
     jd_id: str
     drive_folder_url: str
@@ -83,6 +95,7 @@ class ResumeRankingResult(BaseModel):
     experience_level: Optional[float] = None
     matched_keywords: Optional[List[str]] = None
     status: Optional[str] = None
+    summary: Optional[str] = None
     candidate_summary: Optional[CandidateSummary] = None
 
 
@@ -90,3 +103,64 @@ class ResumeRankingResponse(BaseModel):
     jd_id: str
     drive_folder_id: str
     results: List[ResumeRankingResult]
+
+
+class RankingJobProgress(BaseModel):
+    stage: str
+    total: int = 0
+    downloaded: int = 0
+    extracted: int = 0
+    scored: int = 0
+    skipped: int = 0
+
+
+class RankingJobStatus(BaseModel):
+    job_id: str
+    jd_id: str
+    drive_folder_url: str
+    status: str
+    progress: RankingJobProgress
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class TalentPoolIngestRequest(BaseModel):
+    drive_folder_url: str
+
+
+class TalentPoolIngestResponse(BaseModel):
+    ingested: int
+    skipped: int
+    resume_ids: List[str]
+
+
+class TalentPoolSearchRequest(BaseModel):
+    jd_id: str
+    top_k: conint(ge=1, le=100) = 10
+    candidates: conint(ge=1, le=500) = 50
+
+
+class TalentPoolMatch(BaseModel):
+    rank: int
+    resume_id: str
+    resume_name: str
+    candidate_name: Optional[str] = None
+    score: float
+    bi_score: float
+    cross_score: float
+    matched_keywords: List[str] = []
+    status: str
+
+
+class TalentPoolSearchResponse(BaseModel):
+    jd_id: str
+    results: List[TalentPoolMatch]
+
+
+class TalentPoolStats(BaseModel):
+    resumes: int
+    chunks: int
+    index_trained: bool
+    index_lists: int
+    nprobe: int
@@ -1,16 +1,25 @@
-import os
-from fastapi import APIRouter, HTTPException, UploadFile, File, Query, BackgroundTasks
-from app.models import JDCreateRequest, JDResponse, JDApproveResponse, JDRejectRequest, JDUpdateTextRequest, JDExtractResponse, ResumeRankingRequest, ResumeRankingResponse
-from app.services.jd_service import create_jd, approve_jd, reject_jd, regenerate_jd, update_jd_text, extract_fields_from_text, get_templates
-from app.services.resume_ranker import extract_folder_id, get_drive_service, fetch_pdfs_from_drive, rank_resumes_against_jd
+import asyncio
+import json
+import threading
+from typing import Optional
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.models import JDCreateRequest, JDResponse, JDApproveResponse, JDRejectRequest, JDUpdateTextRequest, JDExtractResponse, JDVersionPage, ResumeRankingRequest, ResumeRankingResponse, RankingJobStatus
+from app.services.jd_service import create_jd, approve_jd, reject_jd, regenerate_jd, update_jd_text, extract_fields_from_text, aextract_fields_from_text, get_templates, get_jd, list_jds_page, project_jd, list_etag, get_jd_versions, to_jd_response
+from app.services.jd_documents import UnsupportedFileType, UploadTooLarge, extract_upload_text
+from app.services.resume_ranker import extract_folder_id
+from app.services.pipeline import PipelineCancelled
+from app.services.ranking_service import run_resume_ranking
+from app.services.ranking_jobs import submit_ranking_job, get_ranking_job, get_ranking_job_result
 from app.storage import JD_STORE
 
 router = APIRouter(prefix="/jd", tags=["Job Description"])
 
-@router.post("/create", response_model=JDResponse)
+@router.post("/create", response_model=JDResponse, response_model_exclude_unset=True)
 def create_jd_api(payload: JDCreateRequest):
     jd = create_jd(payload.fields.dict())
-    return jd
+    return to_jd_response(jd)
 
 
 @router.post("/{jd_id}/approve", response_model=JDApproveResponse)
@@ -31,11 +40,11 @@ def reject_jd_api(jd_id: str, payload: JDRejectRequest):
         raise HTTPException(status_code=404, detail="JD not found")
 
 
-@router.post("/{jd_id}/regenerate", response_model=JDResponse)
+@router.post("/{jd_id}/regenerate", response_model=JDResponse, response_model_exclude_unset=True)
 def regenerate_jd_api(jd_id: str):
     try:
         jd = regenerate_jd(jd_id)
-        return jd
+        return to_jd_response(jd)
     except ValueError:
         raise HTTPException(status_code=404, detail="JD not found")
 
@@ -47,31 +56,21 @@ def extract_from_text_api(text: str = Query(..., description="JD text to extract
 
 
 @router.post("/extract/file")
-def extract_from_file_api(file: UploadFile = File(...)):
+async def extract_from_file_api(file: UploadFile = File(...)):
     try:
-        # Extract text from file
-        if file.filename.lower().endswith('.pdf'):
-            import pdfplumber
-            with pdfplumber.open(file.file) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    text += page.extract_text() + "\n"
-        elif file.filename.lower().endswith('.docx'):
-            from docx import Document
-            doc = Document(file.file)
-            text = ""
-            for para in doc.paragraphs:
-                text += para.text + "\n"
-        else:
-            text = "Unsupported file format"
+        # Parse off the event loop
+        text = await extract_upload_text(file)
 
         # Extract fields from the text
-        from app.services.jd_service import extract_fields_from_text
-        result = extract_fields_from_text(text)
+        result = await aextract_fields_from_text(text)
         result["file_name"] = file.filename
         result["file_size"] = len(text.encode('utf-8'))
         return result
 
+    except UnsupportedFileType as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         # Return mock data on error
         return {
@@ -99,116 +98,178 @@ def get_templates_api():
 
 
 @router.get("/list")
-def list_jds():
-    return list(JD_STORE.values())
+def list_jds_api(
+    request: Request,
+    status: Optional[str] = Query(None),
+    title: Optional[str] = Query(None, description="Case-insensitive substring match"),
+    level: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated keys to return, e.g. jd_id,status,fields.title"),
+    include_versions: bool = Query(False, description="Deprecated: include the full version history")
+):
+    try:
+        jds, next_cursor = list_jds_page(status, title, level, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
+    projection = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    etag = list_etag(jds, status, title, level, limit, cursor, fields, include_versions, next_cursor)
+    headers = {"ETag": etag}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
 
-@router.get("/{jd_id}")
-def get_jd_api(jd_id: str):
-    jd = JD_STORE.get(jd_id)
-    if not jd:
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    body = [to_jd_response(jd, include_versions) for jd in jds]
+    if projection:
+        body = [project_jd(item, projection) for item in body]
+    return JSONResponse(content=jsonable_encoder(body), headers=headers)
+
+
+@router.get("/{jd_id}", response_model=JDResponse, response_model_exclude_unset=True)
+def get_jd_api(
+    jd_id: str,
+    include_versions: bool = Query(False, description="Deprecated: include the full version history; use /{jd_id}/versions")
+):
+    try:
+        return to_jd_response(get_jd(jd_id), include_versions)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="JD not found")
+
+
+@router.get("/{jd_id}/versions", response_model=JDVersionPage)
+def get_jd_versions_api(
+    jd_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100)
+):
+    try:
+        return get_jd_versions(jd_id, offset, limit)
+    except ValueError:
         raise HTTPException(status_code=404, detail="JD not found")
-    return jd
 
 
 @router.post("/rank-resumes", response_model=ResumeRankingResponse)
-def rank_resumes_api(request: ResumeRankingRequest, background_tasks: BackgroundTasks):
+def rank_resumes_api(request: ResumeRankingRequest):
+    """
+    Synchronous ranking, kept because the JD creation page and existing
+    clients expect the results in the response. It runs on FastAPI's
+    threadpool, so it holds a worker thread (not the event loop) for the
+    whole ranking; use /rank-resumes/jobs or /rank-resumes/stream for
+    large folders.
+    """
     try:
         # Get JD from storage
         jd = JD_STORE.get(request.jd_id)
         if not jd:
             raise HTTPException(status_code=404, detail="JD not found")
 
-        # Extract folder ID from URL
-        folder_id = extract_folder_id(request.drive_folder_url)
-
-        # Note: In production, you'd pass the actual credentials path
-        # For now, this is a placeholder - credentials need to be configured
-        credentials_path = "path/to/service-account.json"  # TODO: Configure this
+        # Validate the folder URL before doing any work
+        extract_folder_id(request.drive_folder_url)
 
         try:
-            # Check if credentials file exists
-            credentials_path = "app/credentials.json"
-            if not os.path.exists(credentials_path):
-                # Return mock results if no credentials
-                mock_results = [
-                    {
-                        "rank": 1,
-                        "resume_name": "John_Doe_Resume.pdf",
-                        "score": 0.85,
-                        "role_category": "development",
-                        "experience_level": 0.8,
-                        "matched_keywords": ["Python", "Django", "React", "SQL"],
-                        "status": "High Match"
-                    },
-                    {
-                        "rank": 2,
-                        "resume_name": "Jane_Smith_Resume.pdf",
-                        "score": 0.78,
-                        "role_category": "development",
-                        "experience_level": 0.6,
-                        "matched_keywords": ["Python", "JavaScript", "Node.js"],
-                        "status": "High Match"
-                    },
-                    {
-                        "rank": 3,
-                        "resume_name": "Bob_Johnson_Resume.pdf",
-                        "score": 0.72,
-                        "role_category": "testing",
-                        "experience_level": 0.7,
-                        "matched_keywords": ["Selenium", "Java", "TestNG"],
-                        "status": "Medium Match"
-                    },
-                    {
-                        "rank": 4,
-                        "resume_name": "Alice_Williams_Resume.pdf",
-                        "score": 0.68,
-                        "role_category": "development",
-                        "experience_level": 0.5,
-                        "matched_keywords": ["Python", "Flask"],
-                        "status": "Medium Match"
-                    },
-                    {
-                        "rank": 5,
-                        "resume_name": "Charlie_Brown_Resume.pdf",
-                        "score": 0.65,
-                        "role_category": "general",
-                        "experience_level": 0.4,
-                        "matched_keywords": ["Communication", "Teamwork"],
-                        "status": "Low Match"
-                    }
-                ]
-                return {
-                    "jd_id": request.jd_id,
-                    "drive_folder_id": folder_id,
-                    "results": mock_results,
-                    "note": "Using mock data - Google credentials not configured"
-                }
-
-            # Use actual Drive integration if credentials exist
-            service = get_drive_service(credentials_path)
-            pdfs = fetch_pdfs_from_drive(service, folder_id)
-            results = rank_resumes_against_jd(jd["jd_text"], pdfs)
-
-            # Ensure all required fields are present in results
-            for result in results:
-                if 'role_category' not in result:
-                    result['role_category'] = 'general'
-                if 'experience_level' not in result:
-                    result['experience_level'] = 0.0
-                if 'matched_keywords' not in result:
-                    result['matched_keywords'] = []
-                if 'status' not in result:
-                    result['status'] = 'Low Match'
-
-            return {
-                "jd_id": request.jd_id,
-                "drive_folder_id": folder_id,
-                "results": results
-            }
-
+            return run_resume_ranking(jd, request.drive_folder_url)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Resume ranking error: {str(e)}")
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("/rank-resumes/stream")
+async def stream_rank_resumes_api(
+    jd_id: str = Query(...),
+    drive_folder_url: str = Query(...)
+):
+    """
+    Server-Sent Events variant of /rank-resumes: emits downloaded,
+    extracted and scored events per resume as the pipeline runs, then a
+    final "result" event with the re-ranked ResumeRankingResponse.
+    """
+    jd = JD_STORE.get(jd_id)
+    if not jd:
+        raise HTTPException(status_code=404, detail="JD not found")
+    try:
+        extract_folder_id(drive_folder_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    # Set when the client disconnects, so ranking stops instead of running
+    # on for nobody
+    cancel = threading.Event()
+
+    def on_event(event: str, data: dict):
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    def run():
+        try:
+            result = run_resume_ranking(jd, drive_folder_url, on_event=on_event, cancel=cancel)
+            on_event("result", ResumeRankingResponse(**result).dict())
+        except PipelineCancelled:
+            pass
+        except Exception as e:
+            on_event("error", {"detail": f"Resume ranking error: {str(e)}"})
+
+    async def event_stream():
+        task = loop.run_in_executor(None, run)
+        try:
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(events.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(event, data)
+                if event in ("result", "error"):
+                    break
+            await task
+        finally:
+            cancel.set()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/rank-resumes/jobs", response_model=RankingJobStatus, status_code=202)
+def submit_rank_resumes_job_api(request: ResumeRankingRequest):
+    jd = JD_STORE.get(request.jd_id)
+    if not jd:
+        raise HTTPException(status_code=404, detail="JD not found")
+    try:
+        extract_folder_id(request.drive_folder_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return submit_ranking_job(jd, request.drive_folder_url)
+
+
+@router.get("/rank-resumes/jobs/{job_id}", response_model=RankingJobStatus)
+def get_rank_resumes_job_api(job_id: str):
+    job = get_ranking_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/rank-resumes/jobs/{job_id}/result", response_model=ResumeRankingResponse)
+def get_rank_resumes_job_result_api(job_id: str):
+    job = get_ranking_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=f"Resume ranking error: {job['error']}")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return get_ranking_job_result(job_id)
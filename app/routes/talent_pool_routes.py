@@ -0,0 +1,62 @@
+from typing import List
+from fastapi import APIRouter, HTTPException, UploadFile, File
+from app.models import TalentPoolIngestRequest, TalentPoolIngestResponse, TalentPoolSearchRequest, TalentPoolSearchResponse, TalentPoolStats
+from app.services.talent_pool import EmbedModelMismatch, ingest_drive_folder, ingest_resumes, delete_resume, get_pool_stats, search_talent_pool
+from app.storage import JD_STORE
+
+router = APIRouter(prefix="/talent-pool", tags=["Talent Pool"])
+
+
+@router.post("/ingest", response_model=TalentPoolIngestResponse)
+def ingest_drive_folder_api(request: TalentPoolIngestRequest):
+    try:
+        return ingest_drive_folder(request.drive_folder_url)
+    except EmbedModelMismatch as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.post("/resumes", response_model=TalentPoolIngestResponse)
+def upload_resumes_api(files: List[UploadFile] = File(...)):
+    # (name, bytes) pairs, so two uploads with the same file name are both kept
+    pdfs = []
+    for file in files:
+        if not file.filename.lower().endswith(".pdf"):
+            raise HTTPException(status_code=400, detail=f"Unsupported file type: {file.filename}")
+        pdfs.append((file.filename, file.file.read()))
+    try:
+        return ingest_resumes(pdfs, source="upload")
+    except EmbedModelMismatch as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.delete("/resumes/{resume_id}")
+def delete_resume_api(resume_id: str):
+    if not delete_resume(resume_id):
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return {"resume_id": resume_id, "deleted": True}
+
+
+@router.get("/stats", response_model=TalentPoolStats)
+def talent_pool_stats_api():
+    return get_pool_stats()
+
+
+@router.post("/search", response_model=TalentPoolSearchResponse)
+def search_talent_pool_api(request: TalentPoolSearchRequest):
+    jd = JD_STORE.get(request.jd_id)
+    if not jd:
+        raise HTTPException(status_code=404, detail="JD not found")
+    if request.candidates < request.top_k:
+        raise HTTPException(status_code=400, detail="top_k must be no larger than candidates")
+
+    try:
+        results = search_talent_pool(jd["jd_text"], top_k=request.top_k, candidates=request.candidates)
+    except EmbedModelMismatch as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Talent pool search error: {str(e)}")
+    return {"jd_id": request.jd_id, "results": results}
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path: str) -> str:
+    """
+    sha256_hex of a file's contents, hashed through mmap so the file is
+    never copied into memory
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256(b"").hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return hashlib.sha256(data).hexdigest()
+
+
+class DiskCache:
+    """
+    Small persistent key -> JSON cache, one file per entry.
+
+    Entries are sharded by the first two characters of the key. File mtimes
+    double as the LRU clock: reads touch the entry, and when the cache grows
+    past max_bytes the least recently used files are removed first.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttl_seconds: Optional[float] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _entries(self):
+        if not os.path.isdir(self.directory):
+            return
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".json"):
+                    yield entry
+
+    def _scan_size(self) -> int:
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cache entry {path}: {str(e)}")
+            self.delete(key)
+            return None
+
+        if self.ttl_seconds is not None and time.time() - payload.get("stored_at", 0) > self.ttl_seconds:
+            self.delete(key)
+            return None
+
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return payload.get("value")
+
+    def set(self, key: str, value: dict) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps({"stored_at": time.time(), "value": value}).encode("utf-8")
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            try:
+                self._total_bytes -= os.path.getsize(path)
+            except OSError:
+                pass
+            os.replace(tmp_path, path)
+            self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str) -> None:
+        path = self._path(key)
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                return
+            if self._total_bytes is not None:
+                self._total_bytes -= size
+
+    def _evict(self) -> None:
+        """
+        Remove least recently used entries until the cache is back under 90%
+        of its budget. Caller holds the lock.
+        """
+        entries = sorted(
+            ((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self._entries()),
+        )
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        self._total_bytes = total
+        logger.info(f"Evicted {removed} entries from {self.directory}")
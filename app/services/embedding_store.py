@@ -0,0 +1,193 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import CACHE_DIR, EMBED_STORE_DTYPE
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """
+    Append-only embedding store for one model.
+
+    Vectors live in a flat memory-mapped array file (vectors.bin) and an
+    index file (index.tsv) maps text hashes to row numbers, one
+    "<hash>\\t<row>" line per vector. Rows are written before their index
+    line, so a crash can only leave unreferenced rows behind.
+    """
+
+    def __init__(self, directory: str, model_name: str, dtype: str = EMBED_STORE_DTYPE):
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self.directory = os.path.join(directory, slug)
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.dim: Optional[int] = None
+
+        self._rows: Dict[str, int] = {}
+        self._count = 0
+        self._index_offset = 0
+        self._vectors: Optional[np.memmap] = None
+        self._capacity = 0
+        self._lock = threading.RLock()
+
+        self._meta_path = os.path.join(self.directory, "meta.json")
+        self._index_path = os.path.join(self.directory, "index.tsv")
+        self._vectors_path = os.path.join(self.directory, "vectors.bin")
+        self._lock_path = os.path.join(self.directory, ".lock")
+
+        self._refresh()
+
+    def __len__(self) -> int:
+        return self._count
+
+    # -----------------------------------------------------
+    # file handling
+    # -----------------------------------------------------
+    @contextmanager
+    def _file_lock(self):
+        """
+        Cross-process lock so several uvicorn workers can share one store
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._lock_path, "a") as fh:
+            if fcntl:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _open_vectors(self, min_rows: int) -> None:
+        row_bytes = self.dim * self.dtype.itemsize
+        size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        capacity = size // row_bytes
+        if capacity < min_rows:
+            capacity = max(min_rows, capacity * 2, 1024)
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(capacity * row_bytes)
+        if self._vectors is None or capacity != self._capacity:
+            self._vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode="r+", shape=(capacity, self.dim))
+            self._capacity = capacity
+
+    def _refresh(self) -> None:
+        """
+        Pick up index lines appended since the last read, possibly by
+        another process
+        """
+        if self.dim is None and os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+            self.dim = meta["dim"]
+            self.dtype = np.dtype(meta["dtype"])
+        if self.dim is None or not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, "r", encoding="utf-8") as f:
+            f.seek(self._index_offset)
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # partially written line
+                key, row = line.rstrip("\n").split("\t")
+                self._rows[key] = int(row)
+                self._count = max(self._count, int(row) + 1)
+                self._index_offset += len(line.encode("utf-8"))
+        if self._count:
+            self._open_vectors(self._count)
+
+    # -----------------------------------------------------
+    # public API
+    # -----------------------------------------------------
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        with self._lock:
+            if any(key not in self._rows for key in keys):
+                self._refresh()
+            return {
+                key: np.asarray(self._vectors[self._rows[key]], dtype=np.float32)
+                for key in keys if key in self._rows
+            }
+
+    def add_many(self, keys: List[str], vectors: np.ndarray) -> None:
+        if not keys:
+            return
+        vectors = np.asarray(vectors)
+        with self._lock, self._file_lock():
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                with open(self._meta_path, "w") as f:
+                    json.dump({"model_name": self.model_name, "dim": self.dim, "dtype": self.dtype.name}, f)
+            self._refresh()
+
+            new = [(key, vec) for key, vec in zip(keys, vectors) if key not in self._rows]
+            if not new:
+                return
+            start = self._count
+            self._open_vectors(start + len(new))
+            for offset, (_, vec) in enumerate(new):
+                self._vectors[start + offset] = vec.astype(self.dtype)
+            self._vectors.flush()
+
+            lines = "".join(f"{key}\t{start + offset}\n" for offset, (key, _) in enumerate(new))
+            with open(self._index_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._refresh()
+
+
+_STORES: Dict[str, EmbeddingStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_embedding_store(model_name: str) -> EmbeddingStore:
+    with _STORES_LOCK:
+        store = _STORES.get(model_name)
+        if store is None:
+            store = EmbeddingStore(os.path.join(CACHE_DIR, "embeddings"), model_name)
+            _STORES[model_name] = store
+        return store
+
+
+def encode_with_store(model, model_name: str, texts: List[str], batch_size: int = 32) -> np.ndarray:
+    """
+    Encode texts with the bi-encoder, reusing stored vectors and only running
+    the model on texts that have not been seen before
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    store = get_embedding_store(model_name)
+    keys = [text_hash(t) for t in texts]
+    found = store.get_many(list(set(keys)))
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in found and key not in missing:
+            missing[key] = text
+
+    if missing:
+        new_vectors = np.asarray(
+            model.encode(list(missing.values()), batch_size=batch_size, convert_to_numpy=True),
+            dtype=np.float32,
+        )
+        store.add_many(list(missing.keys()), new_vectors)
+        found.update(zip(missing.keys(), new_vectors))
+        logger.info(f"Embedding store {model_name}: {len(texts) - len(missing)} hits, {len(missing)} encoded")
+
+    return np.stack([found[key] for key in keys])
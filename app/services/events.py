@@ -0,0 +1,24 @@
+import logging
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# PROGRESS EVENTS
+# =========================================================
+# Progress callback: on_event(event_name, payload)
+EventCallback = Callable[[str, dict], None]
+
+
+def emit(on_event: Optional[EventCallback], event: str, **data) -> None:
+    """
+    Send a progress event; a failing callback is logged and never
+    interrupts the work reporting it
+    """
+    if on_event is None:
+        return
+    try:
+        on_event(event, data)
+    except Exception as e:
+        logger.warning(f"Progress callback failed for {event}: {str(e)}")
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+from starlette.responses import JSONResponse
+
+from app.config import JD_PARSE_WORKERS, JD_UPLOAD_MAX_MB
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# JD DOCUMENT UPLOADS
+# =========================================================
+# Starlette has already spooled the upload (in memory up to 1 MB, then to
+# a temporary file), so documents are parsed straight from UploadFile.file
+# in a small thread pool. That keeps pdfplumber / python-docx off the event
+# loop without copying the upload a second time. UploadSizeLimit stops
+# oversized requests before they are spooled.
+SUPPORTED_EXTENSIONS = (".pdf", ".docx")
+# Room for the multipart boundaries and part headers around the file
+_MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UnsupportedFileType(ValueError):
+    pass
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+def parse_jd_document(fileobj: BinaryIO, extension: str) -> str:
+    """
+    Text of a PDF or DOCX JD document; runs on a parse pool thread
+    """
+    if extension == ".pdf":
+        import pdfplumber
+        with pdfplumber.open(fileobj) as pdf:
+            return "\n".join((page.extract_text() or "") for page in pdf.pages)
+    if extension == ".docx":
+        from docx import Document
+        return "\n".join(para.text for para in Document(fileobj).paragraphs)
+    raise UnsupportedFileType(f"Unsupported file format: {extension}")
+
+
+_PARSE_POOL: Optional[ThreadPoolExecutor] = None
+_PARSE_POOL_LOCK = threading.Lock()
+
+
+def _get_parse_pool() -> ThreadPoolExecutor:
+    global _PARSE_POOL
+    with _PARSE_POOL_LOCK:
+        if _PARSE_POOL is None:
+            _PARSE_POOL = ThreadPoolExecutor(max_workers=max(1, JD_PARSE_WORKERS), thread_name_prefix="jd-parse")
+        return _PARSE_POOL
+
+
+def _upload_size(file: UploadFile) -> int:
+    if file.size is not None:
+        return file.size
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
+
+
+async def extract_upload_text(file: UploadFile, max_bytes: int = JD_UPLOAD_MAX_MB * 1024 * 1024) -> str:
+    """
+    Parse an uploaded PDF or DOCX in the parse pool. Raises
+    UnsupportedFileType for other extensions and UploadTooLarge past
+    max_bytes.
+    """
+    extension = os.path.splitext(file.filename or "")[1].lower()
+    if extension not in SUPPORTED_EXTENSIONS:
+        raise UnsupportedFileType(f"Unsupported file format: {extension or file.filename}")
+    if _upload_size(file) > max_bytes:
+        raise UploadTooLarge(f"File is larger than {max_bytes // (1024 * 1024)} MB")
+
+    await file.seek(0)
+    # If the request is cancelled the parse still runs to completion on its
+    # thread; Starlette owns the spooled file and closes it afterwards
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_parse_pool(), parse_jd_document, file.file, extension)
+
+
+class UploadSizeLimit:
+    """
+    ASGI middleware rejecting request bodies to the given paths with 413
+    once they pass max_bytes plus the multipart overhead: straight away
+    from Content-Length, or as soon as a streamed body has sent that much,
+    so an oversized upload is never spooled in full. extract_upload_text
+    still checks the file itself against max_bytes.
+    """
+
+    def __init__(self, app, paths: Tuple[str, ...], max_bytes: int = JD_UPLOAD_MAX_MB * 1024 * 1024):
+        self.app = app
+        self.paths = paths
+        self.max_bytes = max_bytes
+        self.limit = max_bytes + _MULTIPART_OVERHEAD
+
+    def _detail(self) -> str:
+        return f"File is larger than {self.max_bytes // (1024 * 1024)} MB"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.limit:
+            response = JSONResponse({"detail": self._detail()}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.limit:
+                    # Raised into the form parser; FastAPI passes HTTPException through
+                    raise HTTPException(status_code=413, detail=self._detail())
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,11 +1,14 @@
 import uuid
 import json
+import base64
+import hashlib
 from datetime import datetime
-from app.services.llm_service import call_llm
+from app.services.llm_service import call_llm, acall_llm
+from app.services.jd_versions import add_version, get_versions
 from app.storage import JD_STORE, JD_TEMPLATES
 from datetime import datetime
 
-def generate_jd_text(fields: dict) -> str:
+def generate_jd_text(fields: dict, use_cache: bool = True) -> str:
     try:
         prompt = f"""
 You are a professional HR recruiter creating a job description. Based on the following structured data, generate a complete, professional job description.
@@ -47,7 +50,7 @@ INSTRUCTIONS:
 
 Return ONLY the formatted job description text. No additional commentary, explanations, or metadata.
 """
-        return call_llm(prompt)
+        return call_llm(prompt, use_cache=use_cache)
     except RuntimeError as e:
         if "rate limit" in str(e).lower():
             # Fallback: Generate a basic JD text from fields
@@ -74,9 +77,8 @@ This is a generated job description due to API limitations. Please upgrade your
             raise
 
 
-def extract_fields_from_text(text: str) -> dict:
-    try:
-        prompt = f"""
+def _extract_fields_prompt(text: str) -> str:
+    return f"""
 Extract structured job description fields from the following text. Return a JSON object with the following keys:
 - title: string
 - level: string (e.g., Junior, Mid, Senior)
@@ -95,52 +97,87 @@ Text:
 
 Return ONLY valid JSON.
 """
-        response = call_llm(prompt)
-        try:
-            data = json.loads(response)
-            return {
-                "fields": {k: v for k, v in data.items() if k != "confidence_scores"},
-                "confidence_scores": data.get("confidence_scores", {}),
-                "original_text": text
-            }
-        except:
-            # Fallback extraction
-            return {
-                "fields": {
-                    "title": "Extracted Title",
-                    "level": "Mid",
-                    "mandatory_skills": [],
-                    "nice_to_have_skills": [],
-                    "location": "Remote",
-                    "team_size": 1,
-                    "budget": "",
-                    "inclusion_criteria": [],
-                    "exclusion_criteria": []
-                },
-                "confidence_scores": {k: 0.5 for k in ["title", "level", "mandatory_skills", "location"]},
-                "original_text": text
-            }
+
+
+def _is_fields_json(response: str) -> bool:
+    """
+    Whether an extraction response parses as a JSON object; only those are
+    cached, so a malformed answer is not replayed for the same document
+    """
+    try:
+        return isinstance(json.loads(response), dict)
+    except (TypeError, ValueError):
+        return False
+
+
+def _parse_extracted_fields(response: str, text: str) -> dict:
+    try:
+        data = json.loads(response)
+        return {
+            "fields": {k: v for k, v in data.items() if k != "confidence_scores"},
+            "confidence_scores": data.get("confidence_scores", {}),
+            "original_text": text
+        }
+    except:
+        # Fallback extraction
+        return {
+            "fields": {
+                "title": "Extracted Title",
+                "level": "Mid",
+                "mandatory_skills": [],
+                "nice_to_have_skills": [],
+                "location": "Remote",
+                "team_size": 1,
+                "budget": "",
+                "inclusion_criteria": [],
+                "exclusion_criteria": []
+            },
+            "confidence_scores": {k: 0.5 for k in ["title", "level", "mandatory_skills", "location"]},
+            "original_text": text
+        }
+
+
+def _rate_limited_fields(text: str) -> dict:
+    # Fallback extraction when rate limited
+    return {
+        "fields": {
+            "title": "Rate Limited - Basic Extraction",
+            "level": "Mid",
+            "mandatory_skills": ["Please upgrade Groq plan for full extraction"],
+            "nice_to_have_skills": [],
+            "location": "Remote",
+            "team_size": 1,
+            "budget": "",
+            "inclusion_criteria": [],
+            "exclusion_criteria": []
+        },
+        "confidence_scores": {k: 0.1 for k in ["title", "level", "mandatory_skills", "location"]},
+        "original_text": text,
+        "error": "Rate limit exceeded. Using basic extraction."
+    }
+
+
+def extract_fields_from_text(text: str) -> dict:
+    try:
+        response = call_llm(_extract_fields_prompt(text), validate=_is_fields_json)
     except RuntimeError as e:
         if "rate limit" in str(e).lower():
-            # Fallback extraction when rate limited
-            return {
-                "fields": {
-                    "title": "Rate Limited - Basic Extraction",
-                    "level": "Mid",
-                    "mandatory_skills": ["Please upgrade Groq plan for full extraction"],
-                    "nice_to_have_skills": [],
-                    "location": "Remote",
-                    "team_size": 1,
-                    "budget": "",
-                    "inclusion_criteria": [],
-                    "exclusion_criteria": []
-                },
-                "confidence_scores": {k: 0.1 for k in ["title", "level", "mandatory_skills", "location"]},
-                "original_text": text,
-                "error": "Rate limit exceeded. Using basic extraction."
-            }
-        else:
-            raise
+            return _rate_limited_fields(text)
+        raise
+    return _parse_extracted_fields(response, text)
+
+
+async def aextract_fields_from_text(text: str) -> dict:
+    """
+    Async counterpart of extract_fields_from_text for use on the event loop
+    """
+    try:
+        response = await acall_llm(_extract_fields_prompt(text), validate=_is_fields_json)
+    except RuntimeError as e:
+        if "rate limit" in str(e).lower():
+            return _rate_limited_fields(text)
+        raise
+    return _parse_extracted_fields(response, text)
 
 
 def create_jd(fields: dict):
@@ -148,64 +185,41 @@ def create_jd(fields: dict):
     jd_text = generate_jd_text(fields)
     now = datetime.now()
 
-    version = {
-        "version_id": f"V1-{uuid.uuid4().hex[:4].upper()}",
-        "timestamp": now,
-        "status": "DRAFT",
-        "action": "Created",
-        "fields": fields,
-        "jd_text": jd_text
-    }
-
-    JD_STORE[jd_id] = {
+    jd = {
         "jd_id": jd_id,
         "status": "DRAFT",
         "fields": fields,
         "jd_text": jd_text,
-        "versions": [version],
+        "versions": [],
         "created_at": now,
         "updated_at": now
     }
-    return JD_STORE[jd_id]
+    add_version(jd, "Created", previous_text=None, previous_fields=None)
+    JD_STORE.save(jd)
+    return jd
 
 
 def approve_jd(jd_id: str):
-    jd = JD_STORE.get(jd_id)
+    def approve(jd: dict) -> None:
+        jd["status"] = "APPROVED"
+        jd["updated_at"] = datetime.now()
+        add_version(jd, "Approved", previous_text=jd["jd_text"], previous_fields=jd["fields"])
+
+    jd = JD_STORE.update(jd_id, approve)
     if not jd:
         raise ValueError("JD not found")
-
-    jd["status"] = "APPROVED"
-    jd["updated_at"] = datetime.now()
-    # Add version
-    version = {
-        "version_id": f"V{len(jd['versions'])+1}-{uuid.uuid4().hex[:4].upper()}",
-        "timestamp": jd["updated_at"],
-        "status": "APPROVED",
-        "action": "Approved",
-        "fields": jd["fields"],
-        "jd_text": jd["jd_text"]
-    }
-    jd["versions"].append(version)
     return jd
 
 
 def reject_jd(jd_id: str, reason: str):
-    jd = JD_STORE.get(jd_id)
+    def reject(jd: dict) -> None:
+        jd["status"] = "REJECTED"
+        jd["updated_at"] = datetime.now()
+        add_version(jd, f"Rejected: {reason}", previous_text=jd["jd_text"], previous_fields=jd["fields"])
+
+    jd = JD_STORE.update(jd_id, reject)
     if not jd:
         raise ValueError("JD not found")
-
-    jd["status"] = "REJECTED"
-    jd["updated_at"] = datetime.now()
-    # Add version
-    version = {
-        "version_id": f"V{len(jd['versions'])+1}-{uuid.uuid4().hex[:4].upper()}",
-        "timestamp": jd["updated_at"],
-        "status": "REJECTED",
-        "action": f"Rejected: {reason}",
-        "fields": jd["fields"],
-        "jd_text": jd["jd_text"]
-    }
-    jd["versions"].append(version)
     return jd
 
 
@@ -214,40 +228,123 @@ def regenerate_jd(jd_id: str):
     if not jd:
         raise ValueError("JD not found")
 
-    jd["jd_text"] = generate_jd_text(jd["fields"])
-    jd["updated_at"] = datetime.now()
-    # Add version
-    version = {
-        "version_id": f"V{len(jd['versions'])+1}-{uuid.uuid4().hex[:4].upper()}",
-        "timestamp": jd["updated_at"],
-        "status": jd["status"],
-        "action": "Regenerated",
-        "fields": jd["fields"],
-        "jd_text": jd["jd_text"]
-    }
-    jd["versions"].append(version)
+    # Regenerating must produce a fresh draft, not the cached one. The LLM
+    # call happens before the update so the record is not locked meanwhile
+    new_text = generate_jd_text(jd["fields"], use_cache=False)
+
+    def regenerate(jd: dict) -> None:
+        previous_text = jd["jd_text"]
+        jd["jd_text"] = new_text
+        jd["updated_at"] = datetime.now()
+        add_version(jd, "Regenerated", previous_text=previous_text, previous_fields=jd["fields"])
+
+    jd = JD_STORE.update(jd_id, regenerate)
+    if not jd:
+        raise ValueError("JD not found")
     return jd
 
 
 def update_jd_text(jd_id: str, new_jd_text: str):
-    jd = JD_STORE.get(jd_id)
+    def update_text(jd: dict) -> None:
+        previous_text = jd["jd_text"]
+        jd["jd_text"] = new_jd_text
+        jd["updated_at"] = datetime.now()
+        add_version(jd, "Updated Text", previous_text=previous_text, previous_fields=jd["fields"])
+
+    jd = JD_STORE.update(jd_id, update_text)
     if not jd:
         raise ValueError("JD not found")
+    return jd
+
+
+def to_jd_response(jd: dict, include_versions: bool = False) -> dict:
+    """
+    JD without its version history; use get_jd_versions to page through it.
+    include_versions adds the full history back for clients that still read
+    jd.versions (deprecated, to be removed in the next release).
+    """
+    response = {k: v for k, v in jd.items() if k != "versions"}
+    response["version_count"] = len(jd["versions"])
+    if include_versions:
+        response["versions"] = get_versions(jd)
+    return response
+
 
-    jd["jd_text"] = new_jd_text
-    jd["updated_at"] = datetime.now()
-    # Add version
-    version = {
-        "version_id": f"V{len(jd['versions'])+1}-{uuid.uuid4().hex[:4].upper()}",
-        "timestamp": jd["updated_at"],
-        "status": jd["status"],
-        "action": "Updated Text",
-        "fields": jd["fields"],
-        "jd_text": jd["jd_text"]
+def get_jd_versions(jd_id: str, offset: int = 0, limit: int = 20) -> dict:
+    jd = get_jd(jd_id)
+    return {
+        "jd_id": jd_id,
+        "total": len(jd["versions"]),
+        "offset": offset,
+        "limit": limit,
+        "versions": get_versions(jd, offset, limit)
     }
-    jd["versions"].append(version)
+
+
+def get_jd(jd_id: str):
+    jd = JD_STORE.get(jd_id)
+    if not jd:
+        raise ValueError("JD not found")
     return jd
 
 
+def list_jds(status: str = None, title: str = None, level: str = None):
+    return JD_STORE.list(status=status, title=title, level=level)
+
+
+def _encode_cursor(jd: dict) -> str:
+    raw = json.dumps([jd["created_at"].isoformat(), jd["jd_id"]])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str):
+    try:
+        created_at, jd_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(created_at), str(jd_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def list_jds_page(status: str = None, title: str = None, level: str = None, cursor: str = None, limit: int = 50):
+    """
+    One page of JDs in creation order. Returns (jds, next_cursor); next_cursor
+    is None on the last page.
+    """
+    after = _decode_cursor(cursor) if cursor else None
+    jds = JD_STORE.list(status=status, title=title, level=level, after=after, limit=limit + 1)
+    next_cursor = _encode_cursor(jds[limit - 1]) if len(jds) > limit else None
+    return jds[:limit], next_cursor
+
+
+def project_jd(jd_response: dict, fields: list) -> dict:
+    """
+    Keep only the requested keys; "fields.title" selects a single JD field
+    """
+    projected = {}
+    for name in fields:
+        top, _, sub = name.partition(".")
+        if top not in jd_response:
+            continue
+        if sub and isinstance(jd_response[top], dict):
+            if sub in jd_response[top]:
+                projected.setdefault(top, {})[sub] = jd_response[top][sub]
+        else:
+            projected[top] = jd_response[top]
+    return projected
+
+
+def list_etag(jds: list, *parts) -> str:
+    """
+    Validator for a list response: changes whenever any JD on the page
+    changes or the query/projection differs
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(f"{part}\0".encode("utf-8"))
+    for jd in jds:
+        digest.update(f"{jd['jd_id']}@{jd['updated_at'].isoformat()}\0".encode("utf-8"))
+    return f'"{digest.hexdigest()}"'
+
+
 def get_templates():
     return JD_TEMPLATES
@@ -0,0 +1,109 @@
+import uuid
+from difflib import SequenceMatcher
+from typing import List, Optional
+
+from app.config import JD_VERSION_SNAPSHOT_INTERVAL
+
+
+# =========================================================
+# DELTA-ENCODED JD VERSION HISTORY
+# =========================================================
+# A stored version is either a snapshot, holding the full jd_text and
+# fields, or a delta against the previous version's text:
+#   {"kind": "delta", "diff": [[start, end, [new lines]], ...], ...}
+# Each diff entry replaces previous_lines[start:end]; untouched line ranges
+# are implied. Fields are only stored on deltas when they changed. Every
+# JD_VERSION_SNAPSHOT_INTERVAL-th version is a snapshot so reconstruction
+# never replays more than that many deltas. Versions written before this
+# format (no "kind") are full copies and read as snapshots.
+
+
+def _lines(text: str) -> List[str]:
+    return text.splitlines(keepends=True)
+
+
+def _diff(old_text: str, new_text: str) -> list:
+    old_lines, new_lines = _lines(old_text), _lines(new_text)
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    return [
+        [i1, i2, new_lines[j1:j2]]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def _apply(old_text: str, diff: list) -> str:
+    old_lines = _lines(old_text)
+    out, cursor = [], 0
+    for start, end, replacement in diff:
+        out.extend(old_lines[cursor:start])
+        out.extend(replacement)
+        cursor = end
+    out.extend(old_lines[cursor:])
+    return "".join(out)
+
+
+def _is_snapshot(version: dict) -> bool:
+    return version.get("kind", "snapshot") == "snapshot"
+
+
+def add_version(jd: dict, action: str, previous_text: Optional[str], previous_fields: Optional[dict]) -> dict:
+    """
+    Append a version for jd's current fields/jd_text/status. previous_text
+    and previous_fields are the values before this change (None for the
+    first version).
+    """
+    versions = jd["versions"]
+    number = len(versions) + 1
+    version = {
+        "version_id": f"V{number}-{uuid.uuid4().hex[:4].upper()}",
+        "timestamp": jd["updated_at"],
+        "status": jd["status"],
+        "action": action,
+    }
+
+    if previous_text is None or (number - 1) % JD_VERSION_SNAPSHOT_INTERVAL == 0:
+        version.update(kind="snapshot", jd_text=jd["jd_text"], fields=jd["fields"])
+    else:
+        version.update(kind="delta", diff=_diff(previous_text, jd["jd_text"]))
+        if jd["fields"] != previous_fields:
+            version["fields"] = jd["fields"]
+
+    versions.append(version)
+    return version
+
+
+def get_versions(jd: dict, offset: int = 0, limit: Optional[int] = None) -> List[dict]:
+    """
+    Reconstruct full versions (jd_text and fields) for versions[offset:offset+limit]
+    """
+    versions = jd["versions"]
+    end = len(versions) if limit is None else min(len(versions), offset + limit)
+    if offset >= end:
+        return []
+
+    # Start replaying from the nearest snapshot at or before offset
+    start = offset
+    while start > 0 and not _is_snapshot(versions[start]):
+        start -= 1
+
+    text, fields = "", {}
+    result = []
+    for index in range(start, end):
+        stored = versions[index]
+        if _is_snapshot(stored):
+            text = stored["jd_text"]
+        else:
+            text = _apply(text, stored["diff"])
+        fields = stored.get("fields", fields)
+
+        if index >= offset:
+            result.append({
+                "version_id": stored["version_id"],
+                "timestamp": stored["timestamp"],
+                "status": stored["status"],
+                "action": stored["action"],
+                "fields": fields,
+                "jd_text": text,
+            })
+    return result
@@ -0,0 +1,79 @@
+import re
+from typing import Dict, List
+
+
+# =========================================================
+# PRECOMPILED MULTI-KEYWORD MATCHER
+# =========================================================
+_WORD_CHAR = "a-z0-9"
+
+
+class KeywordHits:
+    """
+    Result of one scan: keyword -> start offsets in the lowercased text
+    """
+
+    def __init__(self, keywords: List[str], positions: Dict[str, List[int]]):
+        self.keywords = keywords
+        self.positions = positions
+
+    def matched(self) -> List[str]:
+        return [kw for kw in self.keywords if kw in self.positions]
+
+    def unmatched(self) -> List[str]:
+        return [kw for kw in self.keywords if kw not in self.positions]
+
+    def boost(self) -> float:
+        if not self.keywords:
+            return 0.0
+        return min(len(self.positions) / len(self.keywords), 1.0)
+
+
+class KeywordMatcher:
+    """
+    Matches a fixed keyword list against many texts.
+
+    All keywords are compiled into one case-insensitive alternation, tried
+    at every offset through a lookahead so overlapping keywords are still
+    seen, and bounded by non-alphanumerics on both sides so "java" does
+    not hit inside "javascript". Build one per JD and reuse it for every
+    resume.
+    """
+
+    def __init__(self, keywords: List[str]):
+        self.keywords = list(dict.fromkeys(keywords))
+        self._by_lower: Dict[str, List[str]] = {}
+        for kw in self.keywords:
+            self._by_lower.setdefault(kw.lower(), []).append(kw)
+
+        # Longest first so the alternation prefers "react.js" over "react";
+        # shorter keywords sharing the same start are recovered via _prefixes
+        lowered = sorted(self._by_lower, key=len, reverse=True)
+        self._prefixes = {
+            kw: [other for other in lowered if other != kw and kw.startswith(other)]
+            for kw in lowered
+        }
+        self._pattern = None
+        if lowered:
+            alternation = "|".join(re.escape(kw) for kw in lowered)
+            self._pattern = re.compile(
+                rf"(?<![{_WORD_CHAR}])(?=({alternation})(?![{_WORD_CHAR}]))"
+            )
+
+    def scan(self, text: str) -> KeywordHits:
+        positions: Dict[str, List[int]] = {}
+        if self._pattern is None:
+            return KeywordHits(self.keywords, positions)
+
+        text_l = text.lower()
+        for m in self._pattern.finditer(text_l):
+            start = m.start()
+            found = [m.group(1)]
+            for shorter in self._prefixes[m.group(1)]:
+                end = start + len(shorter)
+                if end == len(text_l) or not text_l[end].isalnum():
+                    found.append(shorter)
+            for kw_l in found:
+                for kw in self._by_lower[kw_l]:
+                    positions.setdefault(kw, []).append(start)
+        return KeywordHits(self.keywords, positions)
@@ -1,19 +1,297 @@
-from groq import Groq, RateLimitError
-from app.config import GROQ_API_KEY, MODEL
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
 
-client = Groq(api_key=GROQ_API_KEY)
+import httpx
+from groq import (
+    Groq, AsyncGroq, RateLimitError, APIConnectionError, APITimeoutError, InternalServerError
+)
+from app.config import (
+    GROQ_API_KEY, MODEL, LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE, LLM_MAX_RETRIES,
+    LLM_MAX_CONNECTIONS, LLM_TIMEOUT_SECONDS, LLM_EXPECTED_COMPLETION_TOKENS,
+    CACHE_DIR, LLM_CACHE_MAX_MB, LLM_CACHE_TTL_SECONDS,
+)
+from app.services.disk_cache import DiskCache, sha256_hex
 
-def call_llm(prompt: str) -> str:
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are an expert HR recruiter assistant."
+
+_RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+
+# =========================================================
+# CLIENT-SIDE RATE LIMITING
+# =========================================================
+class TokenBucketLimiter:
+    """
+    Requests/min and tokens/min buckets shared by every caller in the process.
+
+    Callers reserve capacity up front and are told how long to wait, so
+    concurrent callers queue up in arrival order instead of all firing at
+    once and tripping the provider's rate limit. A Retry-After from the
+    provider pauses every caller until it expires.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.request_rate = requests_per_minute / 60.0
+        self.token_rate = tokens_per_minute / 60.0
+        self.request_capacity = float(requests_per_minute)
+        self.token_capacity = float(tokens_per_minute)
+        self.requests = self.request_capacity
+        self.tokens = self.token_capacity
+        self.blocked_until = 0.0
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        self.updated = now
+        self.requests = min(self.request_capacity, self.requests + elapsed * self.request_rate)
+        self.tokens = min(self.token_capacity, self.tokens + elapsed * self.token_rate)
+
+    def reserve(self, tokens: int) -> float:
+        """
+        Take one request and `tokens` tokens; returns seconds to wait before
+        sending. Balances may go negative, which is what queues later callers.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.requests -= 1
+            self.tokens -= min(tokens, self.token_capacity)
+            wait = max(
+                self.blocked_until - now,
+                -self.requests / self.request_rate if self.requests < 0 else 0.0,
+                -self.tokens / self.token_rate if self.tokens < 0 else 0.0,
+            )
+            return max(wait, 0.0)
+
+    def settle(self, reserved_tokens: int, used_tokens: int) -> None:
+        """
+        Correct the token estimate once the real usage is known
+        """
+        with self._lock:
+            self.tokens = min(self.token_capacity, self.tokens + reserved_tokens - used_tokens)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+limiter = TokenBucketLimiter(LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE)
+
+
+def _estimate_tokens(prompt: str) -> int:
+    # ~4 characters per token plus room for the completion
+    return (len(SYSTEM_PROMPT) + len(prompt)) // 4 + LLM_EXPECTED_COMPLETION_TOKENS
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
     try:
-        res = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": "You are an expert HR recruiter assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.2
-        )
-        return res.choices[0].message.content
-    except RateLimitError as e:
-        # Handle rate limit by raising a custom exception
-        raise RuntimeError(f"Groq API rate limit exceeded: {str(e)}. Please upgrade your plan or try again later.")
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except Exception:
+        return None
+
+
+def _backoff_seconds(attempt: int, error: Exception) -> float:
+    retry_after = _retry_after_seconds(error)
+    if retry_after is not None:
+        # Honour the server's hint, with a little jitter so callers spread out
+        return retry_after + random.uniform(0, 0.5)
+    # Full jitter exponential backoff
+    return random.uniform(0, min(30.0, 2 ** attempt))
+
+
+def _rate_limit_exhausted(error: Exception) -> RuntimeError:
+    # Callers look for "rate limit" in the message to pick their fallback
+    return RuntimeError(f"Groq API rate limit exceeded: {str(error)}. Please upgrade your plan or try again later.")
+
+
+def _messages(prompt: str) -> list:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def _used_tokens(res, fallback: int) -> int:
+    usage = getattr(res, "usage", None)
+    return getattr(usage, "total_tokens", None) or fallback
+
+
+# =========================================================
+# RESPONSE CACHE
+# =========================================================
+_response_cache = DiskCache(
+    os.path.join(CACHE_DIR, "llm"),
+    max_bytes=LLM_CACHE_MAX_MB * 1024 * 1024,
+    ttl_seconds=LLM_CACHE_TTL_SECONDS
+)
+
+
+def _cache_key(prompt: str, temperature: float) -> str:
+    return sha256_hex(f"{MODEL}\0{temperature}\0{SYSTEM_PROMPT}\0{prompt}".encode("utf-8"))
+
+
+def _cached_response(key: str) -> Optional[str]:
+    cached = _response_cache.get(key)
+    return cached["content"] if cached is not None else None
+
+
+def _store_response(key: str, content: str) -> None:
+    if content:
+        _response_cache.set(key, {"model": MODEL, "content": content})
+
+
+# =========================================================
+# CLIENTS
+# =========================================================
+_limits = httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS)
+
+client = Groq(
+    api_key=GROQ_API_KEY,
+    max_retries=0,  # retries are handled here, with the shared limiter
+    timeout=LLM_TIMEOUT_SECONDS,
+    http_client=httpx.Client(limits=_limits, timeout=LLM_TIMEOUT_SECONDS)
+)
+
+# httpx.AsyncClient is bound to the event loop it first runs on. Clients
+# go away with their loop, and clients of closed loops are dropped
+# whenever a new one is created, since a client can keep its loop alive.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncGroq]" = weakref.WeakKeyDictionary()
+_async_clients_lock = threading.Lock()
+
+
+def _get_async_client() -> AsyncGroq:
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        async_client = _async_clients.get(loop)
+        if async_client is None:
+            for closed in [other for other in _async_clients.keys() if other.is_closed()]:
+                del _async_clients[closed]
+            async_client = AsyncGroq(
+                api_key=GROQ_API_KEY,
+                max_retries=0,
+                timeout=LLM_TIMEOUT_SECONDS,
+                http_client=httpx.AsyncClient(limits=_limits, timeout=LLM_TIMEOUT_SECONDS)
+            )
+            _async_clients[loop] = async_client
+        return async_client
+
+
+def call_llm(
+    prompt: str,
+    temperature: float = 0.2,
+    use_cache: bool = True,
+    store: bool = True,
+    validate: Optional[Callable[[str], bool]] = None
+) -> str:
+    """
+    Chat completion for a single prompt. Responses are cached by model,
+    temperature and prompt; use_cache=False skips the lookup but still
+    stores the fresh response, and store=False keeps it out of the cache
+    (for prompts carrying personal data). With validate, only responses it
+    accepts are stored or served from the cache, so a malformed answer is
+    asked for again next time instead of being replayed.
+    """
+    key = _cache_key(prompt, temperature)
+    if use_cache:
+        cached = _cached_response(key)
+        if cached is not None and (validate is None or validate(cached)):
+            return cached
+
+    estimate = _estimate_tokens(prompt)
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        wait = limiter.reserve(estimate)
+        if wait:
+            time.sleep(wait)
+        try:
+            res = client.chat.completions.create(
+                model=MODEL,
+                messages=_messages(prompt),
+                temperature=temperature
+            )
+            limiter.settle(estimate, _used_tokens(res, estimate))
+            content = res.choices[0].message.content
+            if store and (validate is None or validate(content)):
+                _store_response(key, content)
+            return content
+        except _RETRYABLE_ERRORS as e:
+            limiter.settle(estimate, 0)  # nothing was generated
+            delay = _backoff_seconds(attempt, e)
+            if isinstance(e, RateLimitError):
+                # Hold back every caller, not just this one
+                limiter.pause(delay)
+            if attempt == LLM_MAX_RETRIES:
+                if isinstance(e, RateLimitError):
+                    raise _rate_limit_exhausted(e)
+                raise
+            logger.warning(f"LLM call failed ({type(e).__name__}), retrying in {delay:.1f}s (attempt {attempt + 1}/{LLM_MAX_RETRIES})")
+            if not isinstance(e, RateLimitError):
+                time.sleep(delay)  # rate limits are waited out in limiter.reserve()
+
+
+async def acall_llm(
+    prompt: str,
+    temperature: float = 0.2,
+    use_cache: bool = True,
+    store: bool = True,
+    validate: Optional[Callable[[str], bool]] = None
+) -> str:
+    """
+    Async counterpart of call_llm; shares the same rate limiter and cache.
+    Cache file I/O runs in a worker thread, off the event loop.
+    """
+    key = _cache_key(prompt, temperature)
+    if use_cache:
+        cached = await asyncio.get_running_loop().run_in_executor(None, _cached_response, key)
+        if cached is not None and (validate is None or validate(cached)):
+            return cached
+
+    estimate = _estimate_tokens(prompt)
+    async_client = _get_async_client()
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        wait = limiter.reserve(estimate)
+        if wait:
+            await asyncio.sleep(wait)
+        try:
+            res = await async_client.chat.completions.create(
+                model=MODEL,
+                messages=_messages(prompt),
+                temperature=temperature
+            )
+            limiter.settle(estimate, _used_tokens(res, estimate))
+            content = res.choices[0].message.content
+            if store and (validate is None or validate(content)):
+                await asyncio.get_running_loop().run_in_executor(None, _store_response, key, content)
+            return content
+        except _RETRYABLE_ERRORS as e:
+            limiter.settle(estimate, 0)  # nothing was generated
+            delay = _backoff_seconds(attempt, e)
+            if isinstance(e, RateLimitError):
+                # Hold back every caller, not just this one
+                limiter.pause(delay)
+            if attempt == LLM_MAX_RETRIES:
+                if isinstance(e, RateLimitError):
+                    raise _rate_limit_exhausted(e)
+                raise
+            logger.warning(f"LLM call failed ({type(e).__name__}), retrying in {delay:.1f}s (attempt {attempt + 1}/{LLM_MAX_RETRIES})")
+            if not isinstance(e, RateLimitError):
+                await asyncio.sleep(delay)  # rate limits are waited out in limiter.reserve()
@@ -0,0 +1,145 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from app.config import EMBED_MODEL_NAME, CROSS_MODEL_NAME, INFERENCE_BACKEND
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# PROCESS-WIDE MODEL REGISTRY
+# =========================================================
+_MODELS: Dict[str, object] = {}
+_MODEL_STATS: Dict[str, dict] = {}
+_LOCKS: Dict[str, threading.Lock] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """
+    Resident set size of this process, or None if it cannot be determined
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        pass
+    try:
+        import resource
+        import platform
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS and kilobytes elsewhere
+        return rss if platform.system() == "Darwin" else rss * 1024
+    except Exception:
+        return None
+
+
+def _parameter_bytes(model) -> Optional[int]:
+    """
+    Size of the model weights, for torch-backed models
+    """
+    module = getattr(model, "model", model)
+    try:
+        return sum(p.numel() * p.element_size() for p in module.parameters())
+    except Exception:
+        return None
+
+
+def _get_or_load(key: str, loader: Callable[[], object]):
+    model = _MODELS.get(key)
+    if model is not None:
+        return model
+
+    with _REGISTRY_LOCK:
+        lock = _LOCKS.setdefault(key, threading.Lock())
+
+    with lock:
+        model = _MODELS.get(key)
+        if model is not None:
+            return model
+
+        rss_before = _current_rss_bytes()
+        started = time.perf_counter()
+        model = loader()
+        load_seconds = time.perf_counter() - started
+        rss_after = _current_rss_bytes()
+
+        _MODEL_STATS[key] = {
+            "backend": getattr(model, "backend", "torch"),
+            "load_seconds": round(load_seconds, 3),
+            "rss_delta_bytes": (rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+            "parameter_bytes": _parameter_bytes(model),
+            "loaded_at": time.time(),
+        }
+        _MODELS[key] = model
+        logger.info(f"Loaded model {key} in {load_seconds:.2f}s ({_MODEL_STATS[key]})")
+        return model
+
+
+def _load_for_backend(kind: str, model_name: str, load_torch: Callable[[], object]):
+    """
+    Load through ONNX Runtime when INFERENCE_BACKEND is "onnx", falling back
+    to sentence-transformers if that fails
+    """
+    if INFERENCE_BACKEND == "onnx":
+        try:
+            from app.services.onnx_backend import load_onnx_model
+            return load_onnx_model(kind, model_name)
+        except Exception as e:
+            logger.warning(f"ONNX backend unavailable for {model_name}, using sentence-transformers: {str(e)}")
+    return load_torch()
+
+
+def get_embed_model(model_name: str = EMBED_MODEL_NAME):
+    """
+    Shared bi-encoder, loaded once per process
+    """
+    def _load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+
+    return _get_or_load(f"bi:{model_name}", lambda: _load_for_backend("bi", model_name, _load))
+
+
+def get_cross_model(model_name: str = CROSS_MODEL_NAME):
+    """
+    Shared cross-encoder, loaded once per process
+    """
+    def _load():
+        from sentence_transformers import CrossEncoder
+        return CrossEncoder(model_name)
+
+    return _get_or_load(f"cross:{model_name}", lambda: _load_for_backend("cross", model_name, _load))
+
+
+def embed_store_name(model, model_name: str = EMBED_MODEL_NAME) -> str:
+    """
+    Embedding store namespace for vectors produced by model; quantized
+    backends get their own so their vectors never mix with fp32 ones
+    """
+    return getattr(model, "store_name", model_name)
+
+
+def warmup_models() -> dict:
+    """
+    Load both ranking models and run one tiny inference so the first request
+    does not pay for lazy initialisation
+    """
+    embed_model = get_embed_model()
+    cross_model = get_cross_model()
+    embed_model.encode(["warmup"])
+    cross_model.predict([("warmup", "warmup")])
+    return get_model_stats()
+
+
+def get_model_stats() -> dict:
+    """
+    Load time and memory figures for every model loaded in this process
+    """
+    return {
+        "models": {key: dict(value) for key, value in _MODEL_STATS.items()},
+        "process_rss_bytes": _current_rss_bytes(),
+    }
@@ -0,0 +1,131 @@
+import io
+import logging
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+from app.config import CACHE_DIR, OCR_CACHE_MAX_MB, OCR_DPI, OCR_MAX_PAGES, OCR_TIMEOUT_SECONDS, OCR_WORKERS
+from app.services.disk_cache import DiskCache, sha256_hex
+from app.services.pdf_extraction import PdfSource, _open_fitz
+from app.services.process_pools import terminate_pool
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# OCR WORKER POOL
+# =========================================================
+# Image-only pages are rendered here at OCR_DPI and each page image is
+# OCR'd as its own task in a process pool kept apart from text extraction,
+# so a scanned resume neither holds up text PDFs nor has to fit in their
+# time budget. Results are cached by the hash of the rendered page image.
+_OCR_CACHE = DiskCache(
+    os.path.join(CACHE_DIR, "ocr"),
+    max_bytes=OCR_CACHE_MAX_MB * 1024 * 1024,
+)
+
+_OCR_POOL: Optional[ProcessPoolExecutor] = None
+_OCR_POOL_LOCK = threading.Lock()
+
+
+def _get_ocr_pool() -> ProcessPoolExecutor:
+    global _OCR_POOL
+    with _OCR_POOL_LOCK:
+        if _OCR_POOL is None:
+            _OCR_POOL = ProcessPoolExecutor(max_workers=max(1, OCR_WORKERS))
+        return _OCR_POOL
+
+
+def _reset_ocr_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Replace a broken pool, killing any of its workers still running so a
+    hung one does not keep its process; pages other callers queued on it
+    fail with BrokenProcessPool and are reported as failed OCR
+    """
+    global _OCR_POOL
+    with _OCR_POOL_LOCK:
+        if _OCR_POOL is pool:
+            terminate_pool(pool)
+            _OCR_POOL = None
+
+
+def _ocr_image(png: bytes, timeout_seconds: float) -> str:
+    """
+    OCR one rendered page; runs in an OCR worker process. pytesseract kills
+    tesseract once timeout_seconds is up.
+    """
+    import pytesseract
+    from PIL import Image
+
+    return pytesseract.image_to_string(Image.open(io.BytesIO(png)), timeout=max(1, timeout_seconds))
+
+
+def ocr_pdf_pages(
+    source: PdfSource,
+    page_numbers: Optional[List[int]] = None,
+    timeout_seconds: int = OCR_TIMEOUT_SECONDS
+) -> Tuple[Dict[int, str], str]:
+    """
+    OCR the given pages of a PDF (every page when page_numbers is None, up
+    to OCR_MAX_PAGES) in parallel within one time budget.
+
+    Returns ({page_number: text}, outcome) with outcome "ok", "empty",
+    "failed" or "timeout"; pages that were OCR'd are returned whatever the
+    outcome.
+    """
+    deadline = time.monotonic() + timeout_seconds
+    texts: Dict[int, str] = {}
+    futures = {}
+    failed = False
+    pool = _get_ocr_pool()
+
+    try:
+        with _open_fitz(source) as doc:
+            numbers = range(len(doc)) if page_numbers is None else page_numbers
+            for number in list(numbers)[:OCR_MAX_PAGES]:
+                png = doc.load_page(number).get_pixmap(dpi=OCR_DPI).tobytes("png")
+                key = sha256_hex(png)
+                cached = _OCR_CACHE.get(key)
+                if cached is not None:
+                    texts[number] = cached["text"]
+                    continue
+                # Rendering runs alongside OCR of the pages already submitted
+                future = pool.submit(_ocr_image, png, deadline - time.monotonic())
+                futures[future] = (number, key)
+    except BrokenProcessPool:
+        logger.error("OCR pool broke; resetting pool")
+        _reset_ocr_pool(pool)
+        failed = True
+    except Exception as e:
+        logger.error(f"Could not render PDF pages for OCR: {str(e)}")
+        failed = True
+
+    done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+    for future in not_done:
+        future.cancel()  # only this PDF's pages; running ones finish within their own timeout
+    for future in done:
+        number, key = futures[future]
+        try:
+            text = future.result()
+        except (BrokenProcessPool, CancelledError) as e:
+            logger.error(f"OCR pool failed ({type(e).__name__}); resetting pool")
+            _reset_ocr_pool(pool)
+            failed = True
+            continue
+        except Exception as e:
+            logger.warning(f"OCR failed for page {number + 1}: {str(e)}")
+            failed = True
+            continue
+        _OCR_CACHE.set(key, {"text": text})
+        texts[number] = text
+
+    texts = {number: text for number, text in texts.items() if text.strip()}
+    if not_done:
+        logger.warning(f"OCR timed out after {timeout_seconds} seconds ({len(not_done)} of {len(futures)} pages unfinished)")
+        return texts, "timeout"
+    if failed:
+        return texts, "failed"
+    return texts, "ok" if texts else "empty"
@@ -0,0 +1,354 @@
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.config import EMBED_MODEL_NAME, CROSS_MODEL_NAME, ONNX_MODEL_DIR, ONNX_INTRA_OP_THREADS
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# ONNX RUNTIME INFERENCE BACKEND
+# =========================================================
+# Both ranking models can run as int8 dynamically-quantized ONNX graphs.
+# Exports are built on first use from the sentence-transformers checkpoints
+# and written to ONNX_MODEL_DIR/<kind>/<model>/:
+#   model.int8.onnx   quantized graph
+#   tokenizer files   saved with save_pretrained
+#   meta.json         max_length, pooling/normalize (bi) or activation (cross)
+# OnnxEmbedder and OnnxCrossEncoder expose the encode()/predict() subset the
+# ranker uses, so the model registry can hand either backend out.
+
+_MODEL_FILE = "model.int8.onnx"
+
+
+def _model_dir(kind: str, model_name: str) -> str:
+    return os.path.join(ONNX_MODEL_DIR, kind, re.sub(r"[^A-Za-z0-9_.-]", "_", model_name))
+
+
+@contextmanager
+def _export_lock(directory: str):
+    """
+    One export of a model at a time across worker processes; the others
+    wait and then load the finished export
+    """
+    os.makedirs(os.path.dirname(directory), exist_ok=True)
+    with open(f"{directory}.lock", "a") as fh:
+        if fcntl:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _single_output(module, input_names: List[str]):
+    """
+    Wrap a Hugging Face module so torch.onnx.export sees positional inputs
+    and a single tensor output
+    """
+    import torch
+
+    class _Wrapper(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.module = module
+
+        def forward(self, *args):
+            return self.module(**dict(zip(input_names, args)))[0]
+
+    return _Wrapper()
+
+
+def _export(module, tokenizer, output_name: str, directory: str, meta: dict) -> None:
+    import torch
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    input_names = list(tokenizer.model_input_names)
+    sample = tokenizer(["export sample"], ["export sample"] if meta["kind"] == "cross" else None, return_tensors="pt")
+    args = tuple(sample[name] for name in input_names)
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes[output_name] = {0: "batch"}
+
+    # Build in a temp dir next to the target, then move it into place, so a
+    # crashed export never leaves a half-written model behind
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".export-")
+    try:
+        fp32_path = os.path.join(tmp_dir, "model.onnx")
+        with torch.no_grad():
+            torch.onnx.export(
+                _single_output(module.eval(), input_names),
+                args,
+                fp32_path,
+                input_names=input_names,
+                output_names=[output_name],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+            )
+        quantize_dynamic(fp32_path, os.path.join(tmp_dir, _MODEL_FILE), weight_type=QuantType.QInt8)
+        os.remove(fp32_path)
+        tokenizer.save_pretrained(tmp_dir)
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        os.replace(tmp_dir, directory)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def export_bi_encoder(model_name: str = EMBED_MODEL_NAME) -> str:
+    from sentence_transformers import SentenceTransformer
+
+    directory = _model_dir("bi", model_name)
+    model = SentenceTransformer(model_name, device="cpu")
+    pooling = "mean"
+    if len(model) > 1 and hasattr(model[1], "get_pooling_mode_str"):
+        pooling = model[1].get_pooling_mode_str()
+    if pooling not in ("mean", "cls"):
+        raise RuntimeError(f"Unsupported pooling mode for ONNX export: {pooling}")
+
+    meta = {
+        "kind": "bi",
+        "model_name": model_name,
+        "max_length": model.max_seq_length,
+        "pooling": pooling,
+        "normalize": any(type(m).__name__ == "Normalize" for m in model),
+    }
+    started = time.perf_counter()
+    _export(model[0].auto_model, model[0].tokenizer, "last_hidden_state", directory, meta)
+    logger.info(f"Exported {model_name} to {directory} in {time.perf_counter() - started:.1f}s")
+    return directory
+
+
+def export_cross_encoder(model_name: str = CROSS_MODEL_NAME) -> str:
+    import torch
+    from sentence_transformers import CrossEncoder
+
+    directory = _model_dir("cross", model_name)
+    model = CrossEncoder(model_name, device="cpu")
+    # sentence-transformers renamed the attribute across releases
+    activation = getattr(model, "activation_fn", None) or getattr(model, "default_activation_function", None)
+    meta = {
+        "kind": "cross",
+        "model_name": model_name,
+        "max_length": getattr(model, "max_length", None) or 512,
+        "activation": "sigmoid" if isinstance(activation, torch.nn.Sigmoid) else "identity",
+    }
+    started = time.perf_counter()
+    _export(model.model, model.tokenizer, "logits", directory, meta)
+    logger.info(f"Exported {model_name} to {directory} in {time.perf_counter() - started:.1f}s")
+    return directory
+
+
+class _OnnxModel:
+    backend = "onnx-int8"
+
+    def __init__(self, directory: str, intra_op_threads: int = ONNX_INTRA_OP_THREADS):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(directory, "meta.json")) as f:
+            self.meta = json.load(f)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(
+            os.path.join(directory, _MODEL_FILE), options, providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(directory)
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.max_length = self.meta["max_length"]
+        self.directory = directory
+
+    def _run(self, first: List[str], second: Optional[List[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        encoded = self.tokenizer(
+            first, second, padding=True, truncation=True, max_length=self.max_length, return_tensors="np"
+        )
+        feeds = {name: value.astype(np.int64) for name, value in encoded.items() if name in self.input_names}
+        return self.session.run(None, feeds)[0], encoded["attention_mask"]
+
+    @staticmethod
+    def _length_order(lengths: Sequence[int]) -> np.ndarray:
+        # Batch similar lengths together to keep padding down
+        return np.argsort([-n for n in lengths], kind="stable")
+
+
+class OnnxEmbedder(_OnnxModel):
+    """
+    SentenceTransformer-compatible encode() on an int8 ONNX graph
+    """
+
+    def __init__(self, directory: str, intra_op_threads: int = ONNX_INTRA_OP_THREADS):
+        super().__init__(directory, intra_op_threads)
+        # Quantized vectors differ slightly from the fp32 ones, so they are
+        # kept apart from them in the embedding store
+        self.store_name = f"{self.meta['model_name']}@{self.backend}"
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        **kwargs
+    ) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        output = np.zeros((len(texts), 0), dtype=np.float32)
+
+        order = self._length_order([len(t) for t in texts])
+        for start in range(0, len(texts), batch_size):
+            index = order[start:start + batch_size]
+            hidden, mask = self._run([texts[i] for i in index])
+            if self.meta["pooling"] == "cls":
+                pooled = hidden[:, 0]
+            else:
+                weights = mask[..., None].astype(np.float32)
+                pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+            if self.meta["normalize"]:
+                pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            if output.shape[1] == 0:
+                output = np.zeros((len(texts), pooled.shape[1]), dtype=np.float32)
+            output[index] = pooled
+
+        return output[0] if single else output
+
+
+class OnnxCrossEncoder(_OnnxModel):
+    """
+    CrossEncoder-compatible predict() on an int8 ONNX graph
+    """
+
+    def predict(self, sentences: Sequence[Tuple[str, str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        pairs = list(sentences)
+        scores = np.zeros(len(pairs), dtype=np.float32)
+        order = self._length_order([len(a) + len(b) for a, b in pairs])
+        for start in range(0, len(pairs), batch_size):
+            index = order[start:start + batch_size]
+            logits, _ = self._run([pairs[i][0] for i in index], [pairs[i][1] for i in index])
+            scores[index] = logits[:, 0]
+        if self.meta["activation"] == "sigmoid":
+            scores = 1 / (1 + np.exp(-scores))
+        return scores
+
+
+def load_onnx_model(kind: str, model_name: str):
+    """
+    ONNX model for kind "bi" or "cross", exporting it on first use
+    """
+    directory = _model_dir(kind, model_name)
+    if not os.path.exists(os.path.join(directory, "meta.json")):
+        with _export_lock(directory):
+            # Another worker may have finished the export while this one waited
+            if not os.path.exists(os.path.join(directory, "meta.json")):
+                logger.info(f"No ONNX export for {model_name}, building one")
+                (export_bi_encoder if kind == "bi" else export_cross_encoder)(model_name)
+    return OnnxEmbedder(directory) if kind == "bi" else OnnxCrossEncoder(directory)
+
+
+# =========================================================
+# ACCURACY PARITY CHECK
+# =========================================================
+_PARITY_JD = (
+    "Senior backend engineer with 5+ years of Python, Django and PostgreSQL experience. "
+    "Comfortable with AWS, Docker and Kubernetes, and with mentoring a small team."
+)
+_PARITY_RESUMES = [
+    "Backend developer, 6 years building Django and PostgreSQL services on AWS; led a team of four.",
+    "QA engineer experienced in Selenium, TestNG, Postman and Jira for manual and automated testing.",
+    "Data analyst skilled in SQL, Tableau and Python; built weekly reporting dashboards.",
+    "DevOps engineer running Kubernetes clusters with Terraform, Jenkins and Docker on AWS.",
+    "Frontend developer focused on React, TypeScript and design systems for web apps.",
+    "Python engineer, 3 years of Flask microservices, Celery workers and Redis caching.",
+    "Recent graduate with coursework in machine learning, PyTorch and computer vision.",
+    "Site reliability engineer: on-call, Prometheus, Grafana, incident reviews, Linux tuning.",
+]
+
+
+def _spearman(a: np.ndarray, b: np.ndarray) -> float:
+    ranks_a = np.argsort(np.argsort(a))
+    ranks_b = np.argsort(np.argsort(b))
+    return float(np.corrcoef(ranks_a, ranks_b)[0, 1])
+
+
+def parity_report(
+    jd_text: str = _PARITY_JD,
+    resume_texts: Sequence[str] = _PARITY_RESUMES,
+    min_cosine: float = 0.98,
+    min_spearman: float = 0.9
+) -> dict:
+    """
+    Compare the ONNX int8 models against the sentence-transformers ones on
+    the same inputs: per-text embedding cosine, and how closely the JD ->
+    resume scores (bi-encoder similarity and cross-encoder) keep their order
+    """
+    from sentence_transformers import SentenceTransformer, CrossEncoder
+
+    texts = [jd_text] + list(resume_texts)
+    pairs = [(jd_text, text) for text in resume_texts]
+
+    torch_bi = SentenceTransformer(EMBED_MODEL_NAME, device="cpu")
+    onnx_bi = load_onnx_model("bi", EMBED_MODEL_NAME)
+    ref = torch_bi.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    got = onnx_bi.encode(texts)
+    got = got / np.linalg.norm(got, axis=1, keepdims=True)
+    cosines = (ref * got).sum(axis=1)
+
+    torch_cross = CrossEncoder(CROSS_MODEL_NAME, device="cpu")
+    onnx_cross = load_onnx_model("cross", CROSS_MODEL_NAME)
+    ref_cross = np.asarray(torch_cross.predict(pairs), dtype=np.float32)
+    got_cross = onnx_cross.predict(pairs)
+
+    report = {
+        "embed_model": EMBED_MODEL_NAME,
+        "cross_model": CROSS_MODEL_NAME,
+        "embedding_cosine_min": round(float(cosines.min()), 5),
+        "embedding_cosine_mean": round(float(cosines.mean()), 5),
+        "bi_score_spearman": round(_spearman(ref[1:] @ ref[0], got[1:] @ got[0]), 5),
+        "cross_score_max_abs_diff": round(float(np.abs(ref_cross - got_cross).max()), 5),
+        "cross_score_spearman": round(_spearman(ref_cross, got_cross), 5),
+    }
+    report["passed"] = (
+        report["embedding_cosine_min"] >= min_cosine
+        and report["bi_score_spearman"] >= min_spearman
+        and report["cross_score_spearman"] >= min_spearman
+    )
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Build ONNX exports of the ranking models or check their accuracy")
+    parser.add_argument("command", choices=["export", "parity"])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "export":
+        with _export_lock(_model_dir("bi", EMBED_MODEL_NAME)):
+            print(export_bi_encoder())
+        with _export_lock(_model_dir("cross", CROSS_MODEL_NAME)):
+            print(export_cross_encoder())
+    else:
+        result = parity_report()
+        print(json.dumps(result, indent=2))
+        sys.exit(0 if result["passed"] else 1)
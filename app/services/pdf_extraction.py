@@ -0,0 +1,264 @@
+import importlib.util
+import io
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from app.config import EXTRACT_ENOUGH_CHARS, PDF_EXTRACTOR_ORDER
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# PDF SOURCES
+# =========================================================
+# A PDF to extract is either its bytes or the path of a local file. Paths
+# are preferred: they are cheap to send to worker processes and parsers
+# read the file directly instead of a copy.
+PdfSource = Union[bytes, str]
+
+
+def _open_pdf(source: PdfSource):
+    """
+    Binary file object for a PdfSource
+    """
+    return open(source, "rb") if isinstance(source, str) else io.BytesIO(source)
+
+
+def _open_fitz(source: PdfSource):
+    import fitz  # PyMuPDF
+    return fitz.open(source) if isinstance(source, str) else fitz.open(stream=source, filetype="pdf")
+
+
+# =========================================================
+# PAGE EXTRACTORS
+# =========================================================
+# Each extractor yields the text layer of one page at a time, so the engine
+# can stop as soon as it has enough text and never parses pages it will
+# not use. Listed cheapest first; PDF_EXTRACTOR_ORDER can reorder them.
+def _pymupdf_pages(source: PdfSource) -> Iterator[str]:
+    with _open_fitz(source) as doc:
+        for page in doc:
+            yield page.get_text()
+
+
+def _pypdf_pages(source: PdfSource) -> Iterator[str]:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        from PyPDF2 import PdfReader
+    with _open_pdf(source) as pdf_file:
+        for page in PdfReader(pdf_file).pages:
+            yield page.extract_text() or ""
+
+
+def _pdfminer_pages(source: PdfSource) -> Iterator[str]:
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+    with _open_pdf(source) as pdf_file:
+        for layout in extract_pages(pdf_file):
+            yield "".join(element.get_text() for element in layout if isinstance(element, LTTextContainer))
+
+
+_EXTRACTORS: Dict[str, Tuple[Callable[[PdfSource], Iterator[str]], Tuple[str, ...]]] = {
+    # name: (page iterator, modules of which at least one must be installed)
+    "pymupdf": (_pymupdf_pages, ("fitz",)),
+    "pypdf": (_pypdf_pages, ("pypdf", "PyPDF2")),
+    "pdfminer": (_pdfminer_pages, ("pdfminer",)),
+}
+_OCR_MODULES = ("fitz", "pytesseract", "PIL")  # PyMuPDF renders the pages
+
+_available: Optional[List[str]] = None
+_ocr_available: Optional[bool] = None
+
+
+def _installed(module: str) -> bool:
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def available_extractors() -> List[str]:
+    """
+    Installed extractors in the order they are tried
+    """
+    global _available
+    if _available is None:
+        order = [name.strip() for name in PDF_EXTRACTOR_ORDER.split(",") if name.strip()]
+        unknown = [name for name in order if name not in _EXTRACTORS]
+        if unknown:
+            logger.warning(f"Ignoring unknown PDF extractors: {unknown}")
+        _available = [
+            name for name in order
+            if name in _EXTRACTORS and any(_installed(module) for module in _EXTRACTORS[name][1])
+        ]
+        logger.info(f"PDF extractors: {_available}")
+    return _available
+
+
+def ocr_available() -> bool:
+    global _ocr_available
+    if _ocr_available is None:
+        _ocr_available = all(_installed(module) for module in _OCR_MODULES)
+    return _ocr_available
+
+
+# =========================================================
+# EXTRACTION ENGINE
+# =========================================================
+# An attempt is (extractor, outcome, seconds), outcome being one of
+# "ok", "empty" (no text layer found), "failed" or "timeout"
+Attempt = Tuple[str, str, float]
+
+
+class PdfExtraction:
+    """
+    Progress of one extract_pdf call. The pages collected so far stay
+    readable if the caller gives up on the call, so a timeout keeps the text
+    of every page parsed before it.
+    """
+
+    def __init__(self):
+        self.pages: Dict[int, str] = {}
+        self.extractor = "none"
+        # Pages left for OCR: none ([]), these page numbers, or every page (None)
+        self.ocr_pages: Optional[List[int]] = []
+        self.attempts: List[Attempt] = []
+        self.cancelled = False
+        self._current: Optional[Tuple[str, float]] = None
+
+    @property
+    def text(self) -> str:
+        pages = dict(self.pages)  # the extracting thread may still be adding pages
+        return "\n".join(pages[number] for number in sorted(pages))
+
+    def _start(self, extractor: str) -> None:
+        self._current = (extractor, time.perf_counter())
+
+    def _finish(self, outcome: str) -> None:
+        if self._current is not None:
+            extractor, started = self._current
+            self.attempts.append((extractor, outcome, time.perf_counter() - started))
+            self._current = None
+
+    def cancel(self) -> None:
+        """
+        Stop at the next page boundary and record the attempt in flight as timed out
+        """
+        self.cancelled = True
+        self._finish("timeout")
+
+
+def extract_pdf(source: PdfSource, extraction: Optional[PdfExtraction] = None, enough_chars: int = EXTRACT_ENOUGH_CHARS) -> PdfExtraction:
+    """
+    Extract a PDF's text layer page by page with the cheapest installed
+    extractor that finds one, stopping once enough_chars have been
+    collected. A more expensive extractor is only tried when the previous
+    one fails or finds no text at all.
+
+    OCR is left to the caller (see ocr_service): extraction.ocr_pages lists
+    the pages without a text layer, or is None when no extractor could
+    read the PDF at all.
+    """
+    extraction = extraction or PdfExtraction()
+    empty_pages: List[int] = []
+    page_count: Optional[int] = None
+
+    for name in available_extractors():
+        pages_iter = _EXTRACTORS[name][0](source)
+        pages: Dict[int, str] = {}
+        extraction.pages = pages
+        extraction._start(name)
+        try:
+            empty_pages, chars = [], 0
+            for number, text in enumerate(pages_iter):
+                if extraction.cancelled:
+                    return extraction
+                if text.strip():
+                    pages[number] = text
+                    chars += len(text)
+                else:
+                    empty_pages.append(number)
+                if chars >= enough_chars:
+                    break
+        except TimeoutError:
+            raise  # the caller's time budget ran out; see PdfExtraction.cancel
+        except Exception as e:
+            logger.debug(f"{name} failed to extract PDF: {str(e)}")
+            extraction._finish("failed")
+            extraction.pages = {}
+            continue
+        finally:
+            pages_iter.close()
+
+        if pages:
+            extraction._finish("ok")
+            extraction.extractor = name
+            break
+        extraction._finish("empty")
+        extraction.pages = {}
+        page_count = len(empty_pages)
+
+    if extraction.cancelled:
+        return extraction
+    if extraction.pages:
+        extraction.ocr_pages = empty_pages
+    else:
+        extraction.ocr_pages = list(range(page_count)) if page_count is not None else None
+    return extraction
+
+
+# =========================================================
+# PER-EXTRACTOR STATS
+# =========================================================
+# Cumulative latency histogram buckets, in seconds
+_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+_OUTCOMES = ("ok", "empty", "failed", "timeout")
+
+_stats: Dict[str, dict] = {}
+_stats_lock = threading.Lock()
+
+
+def record_attempts(attempts: List[Attempt]) -> None:
+    """
+    Add attempts to this process's stats. Attempts made in extraction
+    worker processes are recorded by the parent when the result comes back.
+    """
+    with _stats_lock:
+        for extractor, outcome, seconds in attempts:
+            stats = _stats.setdefault(extractor, {
+                "outcomes": dict.fromkeys(_OUTCOMES, 0),
+                "buckets": [0] * (len(_LATENCY_BUCKETS) + 1),
+                "total_seconds": 0.0,
+            })
+            stats["outcomes"][outcome] = stats["outcomes"].get(outcome, 0) + 1
+            stats["buckets"][bisect_left(_LATENCY_BUCKETS, seconds)] += 1
+            stats["total_seconds"] += seconds
+
+
+def get_extraction_stats() -> dict:
+    """
+    Per-extractor outcome counts and latency histograms for this process
+    """
+    with _stats_lock:
+        extractors = {}
+        for extractor, stats in _stats.items():
+            count = sum(stats["buckets"])
+            histogram, cumulative = {}, 0
+            for bound, bucket in zip(_LATENCY_BUCKETS + (float("inf"),), stats["buckets"]):
+                cumulative += bucket
+                histogram["+Inf" if bound == float("inf") else f"le_{bound:g}"] = cumulative
+            extractors[extractor] = {
+                "attempts": count,
+                "outcomes": dict(stats["outcomes"]),
+                "mean_seconds": round(stats["total_seconds"] / count, 4) if count else 0.0,
+                "latency_seconds": histogram,
+            }
+    return {
+        "order": available_extractors(),
+        "ocr_available": ocr_available(),
+        "extractors": extractors,
+    }
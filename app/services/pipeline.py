@@ -0,0 +1,179 @@
+import logging
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from app.config import PIPELINE_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# STAGED PIPELINE WITH BOUNDED QUEUES
+# =========================================================
+_DONE = object()
+_POLL_SECONDS = 0.1
+
+
+class PipelineCancelled(Exception):
+    pass
+
+
+def check_cancelled(cancel: Optional[threading.Event]) -> None:
+    """
+    Raise PipelineCancelled once the caller's cancel event is set
+    """
+    if cancel is not None and cancel.is_set():
+        raise PipelineCancelled()
+
+
+class Pipeline:
+    """
+    Runs items from a source iterable through a chain of stages, each with
+    its own pool of worker threads, joined by bounded queues.
+
+    A full queue blocks the stage feeding it, so a slow stage throttles
+    everything upstream instead of letting work pile up in memory. Results
+    come out of the last stage in completion order. The first exception
+    raised by any stage cancels the pipeline and is re-raised to the
+    consumer; a consumer that stops iterating early cancels it as well.
+
+    A stage function returns the item for the next stage, or None to drop
+    the item. Errors that only concern one item should be handled inside
+    the stage function (log it and return None); anything it raises is
+    treated as fatal to the whole pipeline.
+
+    Setting the optional cancel event stops the pipeline from outside (for
+    example when the client waiting for it goes away): no new items are
+    started, and results() raises PipelineCancelled.
+
+    However it ends, results() only returns or raises once every pipeline
+    thread has exited, so a generator source has been closed by then and
+    any cleanup it does runs before the caller moves on.
+    """
+
+    def __init__(self, source: Iterable, queue_size: int = PIPELINE_QUEUE_SIZE, cancel: Optional[threading.Event] = None):
+        self._source = source
+        self._queue_size = max(1, queue_size)
+        self._stages: List[Tuple[str, Callable, int]] = []
+        self._cancel = cancel
+        self._cancelled = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._error: Optional[BaseException] = None
+        self._error_lock = threading.Lock()
+
+    def stage(self, name: str, fn: Callable, workers: int = 1) -> "Pipeline":
+        self._stages.append((name, fn, max(1, workers)))
+        return self
+
+    # -----------------------------------------------------
+    # queue helpers that give up once the pipeline is cancelled
+    # -----------------------------------------------------
+    def _stopped(self) -> bool:
+        if self._cancel is not None and self._cancel.is_set():
+            self._cancelled.set()
+        return self._cancelled.is_set()
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        while not self._stopped():
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue, timeout: Optional[float] = None):
+        waited = 0.0
+        while not self._stopped():
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                waited += _POLL_SECONDS
+                if timeout is not None and waited >= timeout:
+                    return None
+        return _DONE
+
+    def _fail(self, stage: str, error: BaseException) -> None:
+        with self._error_lock:
+            if self._error is None:
+                logger.error(f"Pipeline stage {stage} failed: {str(error)}")
+                self._error = error
+        self._cancelled.set()
+
+    # -----------------------------------------------------
+    # threads
+    # -----------------------------------------------------
+    def _feed(self, outbox: queue.Queue) -> None:
+        try:
+            for item in self._source:
+                if not self._put(outbox, item):
+                    break
+        except BaseException as e:
+            self._fail("source", e)
+        finally:
+            close = getattr(self._source, "close", None)
+            if close is not None:
+                close()  # release resources held by a generator source
+            self._put(outbox, _DONE)
+
+    def _work(self, name: str, fn: Callable, inbox: queue.Queue, outbox: queue.Queue, remaining: list, lock: threading.Lock) -> None:
+        try:
+            while True:
+                item = self._get(inbox)
+                if item is _DONE:
+                    self._put(inbox, _DONE)  # let the other workers of this stage see it
+                    break
+                result = fn(item)
+                if result is not None and not self._put(outbox, result):
+                    break
+        except BaseException as e:  # a dead worker must never go unnoticed
+            self._fail(name, e)
+        finally:
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self._put(outbox, _DONE)
+
+    def _start(self) -> queue.Queue:
+        queues = [queue.Queue(maxsize=self._queue_size) for _ in range(len(self._stages) + 1)]
+        threads = [threading.Thread(target=self._feed, args=(queues[0],), name="pipeline-source", daemon=True)]
+        for index, (name, fn, workers) in enumerate(self._stages):
+            remaining, lock = [workers], threading.Lock()
+            for worker in range(workers):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(name, fn, queues[index], queues[index + 1], remaining, lock),
+                    name=f"pipeline-{name}-{worker}",
+                    daemon=True,
+                ))
+        self._threads = threads
+        for thread in threads:
+            thread.start()
+        return queues[-1]
+
+    def results(self, idle_timeout: Optional[float] = None) -> Iterator:
+        """
+        Yield results as they leave the last stage. With idle_timeout, also
+        yield None whenever nothing has arrived for that long, so the
+        consumer can flush partial batches.
+        """
+        output = self._start()
+        try:
+            while True:
+                item = self._get(output, idle_timeout)
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            self._cancelled.set()
+            # Stage functions in flight finish their current item first
+            for thread in self._threads:
+                thread.join()
+        if self._error is not None:
+            raise self._error
+        check_cancelled(self._cancel)
+
+    def __iter__(self) -> Iterator:
+        return self.results()
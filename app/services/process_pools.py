@@ -0,0 +1,28 @@
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# PROCESS POOL TEARDOWN
+# =========================================================
+def terminate_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Shut a pool down without waiting, terminating its worker processes
+    first: shutdown(wait=False) alone leaves a worker stuck in native code
+    running forever. Tasks still queued or running on the pool fail with
+    BrokenProcessPool, which their callers already treat as a per-item
+    failure.
+    """
+    # Private, but the only handle on the workers; it is None once the
+    # pool has cleaned up after itself
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    for process in processes:
+        try:
+            process.terminate()
+        except Exception as e:  # already exited
+            logger.debug(f"Could not terminate pool worker {process.pid}: {str(e)}")
+    pool.shutdown(wait=False)
+    if processes:
+        logger.warning(f"Terminated {len(processes)} pool worker processes")
@@ -0,0 +1,255 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+from app.config import RANKING_JOB_DB_PATH, RANKING_JOB_WORKERS
+from app.services.ranking_service import run_resume_ranking
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# PERSISTENT JOB QUEUE
+# =========================================================
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ranking_jobs (
+    job_id TEXT PRIMARY KEY,
+    jd_id TEXT NOT NULL,
+    jd_text TEXT NOT NULL,
+    drive_folder_url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    owner_pid INTEGER,
+    owner_token TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ranking_jobs_status ON ranking_jobs(status);
+"""
+
+# Identifies this worker process. It holds an fcntl lock on its own token
+# file for as long as it lives, so a job's owner can be told apart from an
+# unrelated process that reused its pid after a restart.
+_WORKER_TOKEN = uuid.uuid4().hex
+_WORKER_DIR = os.path.join(os.path.dirname(RANKING_JOB_DB_PATH) or ".", "ranking_workers")
+_worker_lock_file = None
+
+_local = threading.local()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _conn() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(RANKING_JOB_DB_PATH) or ".", exist_ok=True)
+        conn = sqlite3.connect(RANKING_JOB_DB_PATH, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def _initial_progress() -> dict:
+    return {"stage": "queued", "total": 0, "downloaded": 0, "extracted": 0, "scored": 0, "skipped": 0}
+
+
+def _row_to_job(row: sqlite3.Row) -> dict:
+    return {
+        "job_id": row["job_id"],
+        "jd_id": row["jd_id"],
+        "drive_folder_url": row["drive_folder_url"],
+        "status": row["status"],
+        "progress": json.loads(row["progress"]),
+        "error": row["error"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+    }
+
+
+def _hold_worker_token() -> None:
+    global _worker_lock_file
+    if fcntl is None or _worker_lock_file is not None:
+        return
+    os.makedirs(_WORKER_DIR, exist_ok=True)
+    _worker_lock_file = open(os.path.join(_WORKER_DIR, f"{_WORKER_TOKEN}.lock"), "a")
+    fcntl.flock(_worker_lock_file, fcntl.LOCK_EX)
+
+
+def _owner_alive(token: Optional[str], pid: Optional[int]) -> bool:
+    """
+    Whether the process that claimed a job is still running. Without
+    fcntl only the pid can be checked, which a restart may have reused.
+    """
+    if fcntl is None:
+        return pid != os.getpid() and _pid_alive(pid)
+    if not token:
+        return False
+    if token == _WORKER_TOKEN:
+        return True
+    path = os.path.join(_WORKER_DIR, f"{token}.lock")
+    if not os.path.exists(path):
+        return False
+    with open(path, "a") as fh:
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(fh, fcntl.LOCK_UN)
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    return False
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=RANKING_JOB_WORKERS, thread_name_prefix="ranking-job")
+        return _executor
+
+
+# =========================================================
+# JOB EXECUTION
+# =========================================================
+class _JobProgress:
+    """
+    Progress of a running job. Events arrive from several pipeline threads,
+    so the counters live here and every event writes the whole snapshot
+    under one lock; the row is never read back and merged.
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.progress = _initial_progress()
+        self._lock = threading.Lock()
+
+    def update(self, event: str, data: dict) -> None:
+        with self._lock:
+            if event == "skipped":
+                self.progress["skipped"] += 1
+            else:
+                self.progress["stage"] = event
+            for key in ("total", "downloaded", "extracted", "scored"):
+                if key in data:
+                    self.progress[key] = data[key]
+            _conn().execute(
+                "UPDATE ranking_jobs SET progress = ?, updated_at = ? WHERE job_id = ?",
+                (json.dumps(self.progress), _now(), self.job_id)
+            )
+
+
+def _run_job(job_id: str) -> None:
+    conn = _conn()
+    _hold_worker_token()
+    # Claim the job; another worker process may already have picked it up
+    claimed = conn.execute(
+        "UPDATE ranking_jobs SET status = 'running', owner_pid = ?, owner_token = ?, updated_at = ? "
+        "WHERE job_id = ? AND status = 'queued'",
+        (os.getpid(), _WORKER_TOKEN, _now(), job_id)
+    ).rowcount
+    if not claimed:
+        return
+
+    row = conn.execute("SELECT * FROM ranking_jobs WHERE job_id = ?", (job_id,)).fetchone()
+    progress = _JobProgress(job_id)
+    try:
+        # The JD text is snapshotted at submit time so a restarted worker
+        # does not depend on the JD still being in memory
+        result = run_resume_ranking(
+            {"jd_id": row["jd_id"], "jd_text": row["jd_text"]},
+            row["drive_folder_url"],
+            on_event=progress.update
+        )
+        progress.update("completed", {})
+        conn.execute(
+            "UPDATE ranking_jobs SET status = 'completed', result = ?, updated_at = ? WHERE job_id = ?",
+            (json.dumps(result, default=str), _now(), job_id)
+        )
+    except Exception as e:
+        logger.exception(f"Ranking job {job_id} failed")
+        progress.update("failed", {})
+        conn.execute(
+            "UPDATE ranking_jobs SET status = 'failed', error = ?, updated_at = ? WHERE job_id = ?",
+            (str(e), _now(), job_id)
+        )
+
+
+def submit_ranking_job(jd: dict, drive_folder_url: str) -> dict:
+    job_id = f"JOB-{uuid.uuid4().hex[:12].upper()}"
+    now = _now()
+    _conn().execute(
+        "INSERT INTO ranking_jobs (job_id, jd_id, jd_text, drive_folder_url, status, progress, created_at, updated_at) "
+        "VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+        (job_id, jd["jd_id"], jd["jd_text"], drive_folder_url, json.dumps(_initial_progress()), now, now)
+    )
+    _get_executor().submit(_run_job, job_id)
+    return get_ranking_job(job_id)
+
+
+def get_ranking_job(job_id: str) -> Optional[dict]:
+    row = _conn().execute("SELECT * FROM ranking_jobs WHERE job_id = ?", (job_id,)).fetchone()
+    return _row_to_job(row) if row else None
+
+
+def get_ranking_job_result(job_id: str) -> Optional[dict]:
+    row = _conn().execute("SELECT result FROM ranking_jobs WHERE job_id = ?", (job_id,)).fetchone()
+    if row is None or row["result"] is None:
+        return None
+    return json.loads(row["result"])
+
+
+def resume_pending_jobs() -> int:
+    """
+    Re-queue jobs left behind by a worker that died mid-run and schedule
+    every queued job. Called once at application startup.
+    """
+    conn = _conn()
+    _hold_worker_token()
+    for row in conn.execute("SELECT job_id, owner_pid, owner_token FROM ranking_jobs WHERE status = 'running'").fetchall():
+        if not _owner_alive(row["owner_token"], row["owner_pid"]):
+            conn.execute(
+                "UPDATE ranking_jobs SET status = 'queued', owner_pid = NULL, owner_token = NULL, updated_at = ? WHERE job_id = ?",
+                (_now(), row["job_id"])
+            )
+
+    queued = [row["job_id"] for row in conn.execute(
+        "SELECT job_id FROM ranking_jobs WHERE status = 'queued' ORDER BY created_at"
+    ).fetchall()]
+    for job_id in queued:
+        _get_executor().submit(_run_job, job_id)
+    if queued:
+        logger.info(f"Resumed {len(queued)} pending ranking jobs")
+    return len(queued)
@@ -0,0 +1,121 @@
+import os
+import logging
+import threading
+from typing import Optional
+
+from app.services.events import EventCallback
+from app.services.resume_ranker import (
+    drive_folder_lock, extract_folder_id, get_drive_service, list_drive_pdfs, iter_pdfs_from_drive, rank_resumes_against_jd
+)
+
+logger = logging.getLogger(__name__)
+
+CREDENTIALS_PATH = "app/credentials.json"
+
+# Returned when Google credentials are not configured
+MOCK_RANKING_RESULTS = [
+    {
+        "rank": 1,
+        "resume_name": "John_Doe_Resume.pdf",
+        "score": 0.85,
+        "role_category": "development",
+        "experience_level": 0.8,
+        "matched_keywords": ["Python", "Django", "React", "SQL"],
+        "status": "High Match"
+    },
+    {
+        "rank": 2,
+        "resume_name": "Jane_Smith_Resume.pdf",
+        "score": 0.78,
+        "role_category": "development",
+        "experience_level": 0.6,
+        "matched_keywords": ["Python", "JavaScript", "Node.js"],
+        "status": "High Match"
+    },
+    {
+        "rank": 3,
+        "resume_name": "Bob_Johnson_Resume.pdf",
+        "score": 0.72,
+        "role_category": "testing",
+        "experience_level": 0.7,
+        "matched_keywords": ["Selenium", "Java", "TestNG"],
+        "status": "Medium Match"
+    },
+    {
+        "rank": 4,
+        "resume_name": "Alice_Williams_Resume.pdf",
+        "score": 0.68,
+        "role_category": "development",
+        "experience_level": 0.5,
+        "matched_keywords": ["Python", "Flask"],
+        "status": "Medium Match"
+    },
+    {
+        "rank": 5,
+        "resume_name": "Charlie_Brown_Resume.pdf",
+        "score": 0.65,
+        "role_category": "general",
+        "experience_level": 0.4,
+        "matched_keywords": ["Communication", "Teamwork"],
+        "status": "Low Match"
+    }
+]
+
+
+def run_resume_ranking(
+    jd: dict,
+    drive_folder_url: str,
+    on_event: Optional[EventCallback] = None,
+    cancel: Optional[threading.Event] = None
+) -> dict:
+    """
+    Full ranking pipeline for one JD and Drive folder: download, extract,
+    score and re-rank. Returns a ResumeRankingResponse-shaped dict.
+    Raises ValueError for an invalid folder URL, and PipelineCancelled
+    once cancel is set.
+    """
+    folder_id = extract_folder_id(drive_folder_url)
+
+    if not os.path.exists(CREDENTIALS_PATH):
+        # Return mock results if no credentials
+        return {
+            "jd_id": jd["jd_id"],
+            "drive_folder_id": folder_id,
+            "results": [dict(r) for r in MOCK_RANKING_RESULTS],
+            "note": "Using mock data - Google credentials not configured"
+        }
+
+    service = get_drive_service(CREDENTIALS_PATH)
+    files = list_drive_pdfs(service, folder_id, fields="id, name, md5Checksum, modifiedTime")
+    # PDFs are streamed into ranking as they download rather than collected
+    # first; the folder stays locked until ranking has read every blob and
+    # the sync has cleaned up after itself
+    with drive_folder_lock(folder_id):
+        pdfs = iter_pdfs_from_drive(
+            service,
+            folder_id,
+            files=files,
+            service_factory=lambda: get_drive_service(CREDENTIALS_PATH),
+            on_event=on_event
+        )
+        try:
+            results = rank_resumes_against_jd(jd["jd_text"], pdfs, on_event=on_event, total=len(files), cancel=cancel)
+        finally:
+            pdfs.close()
+
+    # Ensure all required fields are present in results
+    for result in results:
+        if 'role_category' not in result:
+            result['role_category'] = 'general'
+        if 'experience_level' not in result:
+            result['experience_level'] = 0.0
+        if 'matched_keywords' not in result:
+            result['matched_keywords'] = []
+        if 'status' not in result:
+            result['status'] = 'Low Match'
+
+    return {
+        "jd_id": jd["jd_id"],
+        "drive_folder_id": folder_id,
+        "results": results
+    }
@@ -0,0 +1,156 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+
+# =========================================================
+# PRECOMPILED RESUME FIELD EXTRACTION
+# =========================================================
+# Every pattern is compiled once and only ever run over a bounded window of
+# the text, and the lazy ".*?" gaps of the old patterns are capped at a
+# fixed number of characters on one line, so a long resume cannot make a
+# single search backtrack over the whole document.
+
+_NAME_FLAGS = re.MULTILINE | re.I
+_NAME_PATTERNS = [
+    re.compile(p, _NAME_FLAGS) for p in (
+        r"^([A-Z][a-z]+ [A-Z][a-z]+)",  # First Last
+        r"^([A-Z][a-z]+ [A-Z]\. [A-Z][a-z]+)",  # First M. Last
+        r"^([A-Z][a-z]+ [A-Z][a-z]+ [A-Z][a-z]+)",  # First Middle Last
+        r"Name[:\s]*([A-Z][a-z]+ [A-Z][a-z]+)",  # Name: First Last
+        r"([A-Z][a-z]+ [A-Z][a-z]+)[^\n]{0,120}\n[^\n]{0,120}?(?:email|contact|phone)",  # Name followed by contact info
+        r"([A-Z][a-z]+ [A-Z][a-z]+ [A-Z][a-z]+)[^\n]{0,120}\n[^\n]{0,120}?(?:email|contact|phone)",  # First Middle Last followed by contact
+        r"([A-Z]+ [A-Z]+)",  # ALL CAPS First Last
+        r"([A-Z]+ [A-Z]+ [A-Z]+)",  # ALL CAPS First Middle Last
+    )
+]
+_SECTION_PATTERN = re.compile(r"(summary|objective|profile|about|personal|contact)[^\n]{0,200}\n([^\n]{0,200})\n", re.I)
+_CAPITALIZED_PAIR = re.compile(r"\b([A-Z][a-z]+ [A-Z][a-z]+)\b")
+
+_YEARS_BEFORE = re.compile(r"(\d+)\s*(?:year|yr)s?[^\n]{0,80}?experience")
+_YEARS_AFTER = re.compile(r"experience[^\n]{0,80}?(\d+)\s*(?:year|yr)")
+_SENIORITY = re.compile(r"fresher|entry level|junior|senior|lead")
+
+_HEADER_LINES = 15
+_NAME_WINDOW_CHARS = 5000
+_EARLY_NAME_CHARS = 500
+_SENIORITY_YEARS = {"senior": 5.0, "junior": 2.0, "fresher": 0.5, "entry level": 1.0}
+
+UNKNOWN_CANDIDATE = "Unknown Candidate"
+NO_EXPERIENCE_SUMMARY = "Experience level not specified"
+
+
+class ResumeProfile(NamedTuple):
+    candidate_name: str
+    experience_years: float
+    experience_level: float  # experience_years / 10, capped at 1.0
+    experience_summary: str
+
+
+def _valid_name(candidate: str) -> Optional[str]:
+    name = candidate.strip()
+    words = name.split()
+    # Validate: 2-4 words, each starting with upper case or all caps
+    if 2 <= len(words) <= 4 and all(word[0].isupper() or word.isupper() for word in words):
+        # Convert to title case if all caps
+        return name.title() if name.isupper() else name
+    return None
+
+
+def _name_in(window: str) -> Optional[str]:
+    for pattern in _NAME_PATTERNS:
+        for match in pattern.finditer(window):
+            name = _valid_name(match.group(1))
+            if name:
+                return name
+    return None
+
+
+def _extract_name(text: str) -> str:
+    header = " ".join(text.strip().split("\n")[:_HEADER_LINES])
+    name = _name_in(header) or _name_in(text[:_NAME_WINDOW_CHARS])
+    if name:
+        return name
+
+    # Look for names on the line after a section heading
+    for match in _SECTION_PATTERN.finditer(text, 0, _NAME_WINDOW_CHARS):
+        name = _name_in(match.group(2))
+        if name:
+            return name
+
+    # Last resort: any capitalized pair early in the text
+    match = _CAPITALIZED_PAIR.search(text, 0, _EARLY_NAME_CHARS + 64)
+    if match and match.start() < _EARLY_NAME_CHARS:
+        return match.group(1)
+    return UNKNOWN_CANDIDATE
+
+
+def _extract_experience(text: str):
+    text_l = text.lower()
+    before = _YEARS_BEFORE.search(text_l)
+    after = _YEARS_AFTER.search(text_l)
+    seniority = _SENIORITY.search(text_l)
+
+    # Same precedence as before: a later rule overrides an earlier one
+    years = 0.0
+    if before:
+        years = float(before.group(1))
+    if after:
+        years = float(after.group(1))
+    if seniority and seniority.group(0) in _SENIORITY_YEARS:
+        years = _SENIORITY_YEARS[seniority.group(0)]
+
+    # The summary reports the stated number of years, first rule wins
+    stated = before or after
+    summary = f"{stated.group(1)} years of experience" if stated else NO_EXPERIENCE_SUMMARY
+    return years, summary
+
+
+def _extract_profile(text: str) -> ResumeProfile:
+    years, summary = _extract_experience(text)
+    return ResumeProfile(
+        candidate_name=_extract_name(text),
+        experience_years=years,
+        experience_level=min(years / 10.0, 1.0),
+        experience_summary=summary,
+    )
+
+
+# =========================================================
+# MEMOIZATION
+# =========================================================
+_PROFILE_CACHE_SIZE = 2048
+_profile_cache: "OrderedDict[bytes, ResumeProfile]" = OrderedDict()
+_profile_cache_lock = threading.Lock()
+
+
+def _text_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def extract_profile(text: str) -> ResumeProfile:
+    """
+    Name, years of experience and experience summary for a resume (or JD)
+    text, memoized by a hash of the text
+    """
+    key = _text_key(text)
+    with _profile_cache_lock:
+        profile = _profile_cache.get(key)
+        if profile is not None:
+            _profile_cache.move_to_end(key)
+            return profile
+
+    profile = _extract_profile(text)
+    with _profile_cache_lock:
+        _profile_cache[key] = profile
+        if len(_profile_cache) > _PROFILE_CACHE_SIZE:
+            _profile_cache.popitem(last=False)
+    return profile
+
+
+def clear_profile_cache() -> None:
+    with _profile_cache_lock:
+        _profile_cache.clear()
+
@@ -1,25 +1,49 @@
 from pathlib import Path
 import re
-import tempfile
 import os
 import numpy as np
-from typing import List, Dict
-
-import pdfminer.high_level as pdfminer
-from sentence_transformers import SentenceTransformer, CrossEncoder, util
+from typing import List, Dict, Tuple, Iterator, Iterable, Optional, Callable, Union
+from concurrent.futures import (
+    Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED,
+    CancelledError, TimeoutError as FuturesTimeoutError,
+)
+from concurrent.futures.process import BrokenProcessPool
 
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
 from google.oauth2.service_account import Credentials
-import io
 import signal
 import logging
 import platform
 import threading
 import time
+import json
+import random
 import ssl
-
+from contextlib import contextmanager
+
+from app.config import (
+    CACHE_DIR, RESUME_TEXT_CACHE_MAX_MB, BI_ENCODER_BATCH_SIZE,
+    CROSS_ENCODER_BATCH_SIZE, CROSS_ENCODER_CHUNKS_PER_CANDIDATE, CROSS_ENCODER_MAX_TOKENS, CROSS_ENCODER_JD_TOKENS,
+    EXTRACT_WORKERS, EXTRACT_TIMEOUT_SECONDS, DRIVE_DOWNLOAD_WORKERS, LLM_SUMMARY_WORKERS,
+    PIPELINE_SECTION_WORKERS, PIPELINE_FLUSH_SECONDS,
+)
+from app.services.disk_cache import DiskCache, sha256_hex, sha256_file
+from app.services.embedding_store import encode_with_store
+from app.services.keyword_matcher import KeywordMatcher, KeywordHits
+from app.services.resume_extractors import extract_profile
 from app.services.llm_service import call_llm
+from app.services.events import EventCallback, emit
+from app.services.pipeline import Pipeline, check_cancelled
+from app.services.pdf_extraction import PdfSource, PdfExtraction, extract_pdf, ocr_available, record_attempts
+from app.services.ocr_service import ocr_pdf_pages
+from app.services.process_pools import terminate_pool
+from app.services.model_registry import get_embed_model, get_cross_model, embed_store_name
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -81,10 +105,10 @@ def extract_role_keywords(jd_text: str, top_n: int = 25) -> List[str]:
     return ranked[:top_n]
 
 
-def jd_keyword_boost(resume_text: str, jd_keywords: List[str]) -> float:
-    resume_l = resume_text.lower()
-    hits = sum(1 for kw in jd_keywords if kw in resume_l)
-    return min(hits / len(jd_keywords), 1.0)
+def jd_keyword_boost(resume_text: str, jd_keywords: List[str], hits: Optional[KeywordHits] = None) -> float:
+    if hits is None:
+        hits = KeywordMatcher(jd_keywords).scan(resume_text)
+    return hits.boost()
 
 
 def role_category_detection(jd_text: str) -> str:
@@ -120,101 +144,14 @@ def extract_candidate_name(resume_text: str) -> str:
     """
     Extract candidate name from resume text
     """
-    # Common name patterns
-    name_patterns = [
-        r"^([A-Z][a-z]+ [A-Z][a-z]+)",  # First Last
-        r"^([A-Z][a-z]+ [A-Z]\. [A-Z][a-z]+)",  # First M. Last
-        r"^([A-Z][a-z]+ [A-Z][a-z]+ [A-Z][a-z]+)",  # First Middle Last
-        r"Name[:\s]*([A-Z][a-z]+ [A-Z][a-z]+)",  # Name: First Last
-        r"([A-Z][a-z]+ [A-Z][a-z]+).*?\n.*?(?:email|contact|phone)",  # Name followed by contact info
-        r"([A-Z][a-z]+ [A-Z][a-z]+ [A-Z][a-z]+).*?\n.*?(?:email|contact|phone)",  # First Middle Last followed by contact
-        r"([A-Z]+ [A-Z]+)",  # ALL CAPS First Last
-        r"([A-Z]+ [A-Z]+ [A-Z]+)",  # ALL CAPS First Middle Last
-    ]
-
-    # Check first 15 lines for name
-    lines = resume_text.strip().split('\n')[:15]
-    text_sample = ' '.join(lines)
-
-    for pattern in name_patterns:
-        matches = re.findall(pattern, text_sample, re.MULTILINE | re.I)
-        for match in matches:
-            name = match.strip()
-            words = name.split()
-            # Validate: 2-4 words, each starting with upper case or all caps
-            if 2 <= len(words) <= 4 and all(word and (word[0].isupper() or word.isupper()) for word in words):
-                # Convert to title case if all caps
-                if name.isupper():
-                    name = name.title()
-                return name
-
-    # Fallback: search entire text for name patterns
-    for pattern in name_patterns:
-        matches = re.findall(pattern, resume_text, re.MULTILINE | re.I)
-        for match in matches:
-            name = match.strip()
-            words = name.split()
-            if 2 <= len(words) <= 4 and all(word and (word[0].isupper() or word.isupper()) for word in words):
-                if name.isupper():
-                    name = name.title()
-                return name
-
-    # Additional fallback: look for names in specific sections
-    sections = ["summary", "objective", "profile", "about", "personal", "contact"]
-    for section in sections:
-        section_match = re.search(rf"(?:{section}).*?\n(.*?)\n", resume_text, re.I | re.S)
-        if section_match:
-            section_text = section_match.group(1)
-            for pattern in name_patterns:
-                matches = re.findall(pattern, section_text, re.MULTILINE | re.I)
-                for match in matches:
-                    name = match.strip()
-                    words = name.split()
-                    if 2 <= len(words) <= 4 and all(word and (word[0].isupper() or word.isupper()) for word in words):
-                        if name.isupper():
-                            name = name.title()
-                        return name
-
-    # Last resort: try to find any capitalized phrase that looks like a name
-    potential_names = re.findall(r'\b([A-Z][a-z]+ [A-Z][a-z]+)\b', resume_text)
-    if potential_names:
-        # Return the first one that appears early in the text
-        for name in potential_names:
-            if resume_text.find(name) < 500:  # Within first 500 chars
-                return name
-
-    return "Unknown Candidate"
+    return extract_profile(resume_text).candidate_name
 
 
 def extract_experience_level(resume_text: str) -> float:
     """
     Extract and normalize experience level
     """
-    patterns = [
-        r"(\d+)\s*(?:year|yr)s?.*?experience",
-        r"experience.*?(\d+)\s*(?:year|yr)",
-        r"(fresher|entry level|junior|senior|lead)",
-    ]
-
-    exp_years = 0
-    for pattern in patterns:
-        match = re.search(pattern, resume_text.lower())
-        if match:
-            group1 = match.group(1)
-            if group1.isdigit():
-                exp_years = float(group1)
-            else:
-                level = group1
-                if "senior" in level:
-                    exp_years = 5.0
-                elif "junior" in level:
-                    exp_years = 2.0
-                elif "fresher" in level:
-                    exp_years = 0.5
-                elif "entry level" in level:
-                    exp_years = 1.0
-
-    return min(exp_years / 10.0, 1.0)  # Normalize to 0-1
+    return extract_profile(resume_text).experience_level
 
 
 def extract_candidate_summary(resume_text: str) -> str:
@@ -232,42 +169,48 @@ def extract_candidate_summary(resume_text: str) -> str:
     Summary:
     """
     try:
-        summary = call_llm(prompt)
+        # Resumes are personal data; keep their summaries out of the on-disk LLM cache
+        summary = call_llm(prompt, use_cache=False, store=False)
         return summary.strip()
     except Exception as e:
         return "Summary not available."
 
 
+def summarize_candidates(resume_texts: Dict[str, str], max_workers: int = LLM_SUMMARY_WORKERS) -> Dict[str, str]:
+    """
+    Run extract_candidate_summary for several resumes concurrently, with at
+    most max_workers LLM calls in flight
+    """
+    if not resume_texts:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(resume_texts)))) as executor:
+        futures = {executor.submit(extract_candidate_summary, text): name for name, text in resume_texts.items()}
+        return {futures[future]: future.result() for future in as_completed(futures)}
+
+
 def extract_experience_summary(resume_text: str) -> str:
     """
     Extract a summary of the candidate's experience
     """
-    patterns = [
-        r"(\d+)\s*(?:year|yr)s?.*?experience",
-        r"experience.*?(\d+)\s*(?:year|yr)",
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, resume_text.lower())
-        if match:
-            years = match.group(1)
-            return f"{years} years of experience"
-    return "Experience level not specified"
+    return extract_profile(resume_text).experience_summary
 
 
-def extract_strengths(resume_text: str, jd_keywords: List[str]) -> List[str]:
+def extract_strengths(resume_text: str, jd_keywords: List[str], hits: Optional[KeywordHits] = None) -> List[str]:
     """
     Extract strengths based on matched keywords
     """
-    matched = [kw for kw in jd_keywords if kw in resume_text.lower()]
-    return matched[:5]  # Top 5
+    if hits is None:
+        hits = KeywordMatcher(jd_keywords).scan(resume_text)
+    return hits.matched()[:5]  # Top 5
 
 
-def extract_gaps(resume_text: str, jd_keywords: List[str]) -> List[str]:
+def extract_gaps(resume_text: str, jd_keywords: List[str], hits: Optional[KeywordHits] = None) -> List[str]:
     """
     Extract gaps based on unmatched keywords
     """
-    unmatched = [kw for kw in jd_keywords if kw not in resume_text.lower()]
-    return unmatched[:5]  # Top 5
+    if hits is None:
+        hits = KeywordMatcher(jd_keywords).scan(resume_text)
+    return hits.unmatched()[:5]  # Top 5
 
 
 # =========================================================
@@ -297,8 +240,8 @@ def timeout_handler(signum, frame):
 
 def run_with_timeout(func, timeout_seconds):
     """Cross-platform timeout wrapper"""
-    if platform.system() == "Windows":
-        # Use threading for Windows
+    if platform.system() == "Windows" or threading.current_thread() is not threading.main_thread():
+        # Use threading for Windows, and off the main thread where SIGALRM cannot be installed
         result = [None]
         exception = [None]
 
@@ -327,152 +270,560 @@ def run_with_timeout(func, timeout_seconds):
             signal.alarm(0)
             signal.signal(signal.SIGALRM, old_handler)
 
-def fetch_pdfs_from_drive(service, folder_id: str, timeout_seconds: int = 60, max_retries: int = 5) -> Dict[str, bytes]:
+def list_drive_pdfs(service, folder_id: str, fields: str = "id, name") -> List[dict]:
     """
-    Download all PDF files from a Drive folder with timeout and retry logic
+    List every PDF in a Drive folder, following nextPageToken
     """
-    logger.info(f"Fetching PDFs from folder {folder_id}")
-
     query = f"'{folder_id}' in parents and mimeType='application/pdf' and trashed=false"
-    results = service.files().list(q=query, fields="files(id, name)").execute()
-    files = results.get("files", [])
+    files = []
+    page_token = None
+    while True:
+        results = service.files().list(
+            q=query,
+            fields=f"nextPageToken, files({fields})",
+            pageSize=1000,
+            pageToken=page_token
+        ).execute()
+        files.extend(results.get("files", []))
+        page_token = results.get("nextPageToken")
+        if not page_token:
+            return files
+
+
+def _download_to_file(service, file_id: str, path: str) -> None:
+    """
+    Stream a Drive file to path chunk by chunk, never holding it in memory
+    """
+    request = service.files().get_media(fileId=file_id)
+    with open(path, "wb") as fh:
+        downloader = MediaIoBaseDownload(fh, request)
+        done = False
+        while not done:
+            _, done = downloader.next_chunk()
+
+
+def _retry_delay(attempt: int) -> float:
+    return 2 ** attempt + random.uniform(0, 1)  # Exponential backoff with jitter
+
+
+def _download_with_retry(
+    get_service,
+    file: dict,
+    path: str,
+    timeout_seconds: int,
+    max_retries: int,
+    stop: Optional[threading.Event] = None
+) -> bool:
+    """
+    Download one file to path, retrying with jittered exponential backoff.
+    Runs on a pool thread, so backoff only delays this file. The file only
+    appears at path once it is complete. Setting stop abandons the
+    remaining attempts.
+    """
+    file_name = file["name"]
+    stop = stop or threading.Event()
+    for attempt in range(max_retries):
+        if attempt > 0:
+            sleep_time = _retry_delay(attempt)
+            logger.info(f"Retrying download for {file_name} in {sleep_time:.1f} seconds (attempt {attempt + 1}/{max_retries})")
+            stop.wait(sleep_time)
+        if stop.is_set():
+            return False
+
+        # A timed-out attempt may still be writing, so each attempt gets its own file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.{attempt}.tmp"
+        try:
+            service = get_service()
+            run_with_timeout(lambda: _download_to_file(service, file["id"], tmp_path), timeout_seconds)
+            os.replace(tmp_path, path)
+            logger.info(f"Successfully downloaded {file_name}")
+            return True
+        except TimeoutError:
+            logger.warning(f"Timeout downloading {file_name} (attempt {attempt + 1}/{max_retries})")
+        except ssl.SSLError as e:
+            logger.warning(f"SSL error downloading {file_name}: {str(e)} (attempt {attempt + 1}/{max_retries})")
+        except Exception as e:
+            logger.error(f"Error downloading {file_name}: {str(e)}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
 
-    if not files:
-        logger.warning(f"No PDF files found in folder {folder_id}")
+    logger.error(f"Failed to download {file_name} after {max_retries} attempts")
+    return False
+
+
+def _folder_cache_dir(folder_id: str) -> str:
+    return os.path.join(CACHE_DIR, "drive", re.sub(r"[^A-Za-z0-9_-]", "_", folder_id))
+
+
+def _load_manifest(folder_id: str) -> Dict[str, dict]:
+    path = os.path.join(_folder_cache_dir(folder_id), "manifest.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("files", {})
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable Drive manifest {path}: {str(e)}")
         return {}
 
-    logger.info(f"Found {len(files)} PDF files to download")
 
-    pdfs = {}
-    for file in files:
-        file_name = file["name"]
-        logger.info(f"Downloading {file_name}")
+def _save_manifest(folder_id: str, files: Dict[str, dict]) -> None:
+    folder_dir = _folder_cache_dir(folder_id)
+    os.makedirs(folder_dir, exist_ok=True)
+    path = os.path.join(folder_dir, "manifest.json")
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"folder_id": folder_id, "synced_at": time.time(), "files": files}, f)
+    os.replace(tmp_path, path)
 
-        for attempt in range(max_retries):
-            if attempt > 0:
-                sleep_time = 2 ** attempt  # Exponential backoff
-                logger.info(f"Retrying download for {file_name} in {sleep_time} seconds (attempt {attempt + 1}/{max_retries})")
-                time.sleep(sleep_time)
 
-            try:
-                def download_file():
-                    request = service.files().get_media(fileId=file["id"])
-                    fh = io.BytesIO()
-                    downloader = MediaIoBaseDownload(fh, request)
-                    done = False
-                    while not done:
-                        _, done = downloader.next_chunk()
-                    return fh.getvalue()
-
-                pdfs[file_name] = run_with_timeout(download_file, timeout_seconds)
-                logger.info(f"Successfully downloaded {file_name}")
-                break  # Success, exit retry loop
-
-            except TimeoutError:
-                logger.warning(f"Timeout downloading {file_name} (attempt {attempt + 1}/{max_retries})")
-                if attempt == max_retries - 1:
-                    logger.error(f"Failed to download {file_name} after {max_retries} attempts")
-                    continue  # Skip this file
-            except ssl.SSLError as e:
-                logger.warning(f"SSL error downloading {file_name}: {str(e)} (attempt {attempt + 1}/{max_retries})")
-                if attempt == max_retries - 1:
-                    logger.error(f"Failed to download {file_name} after {max_retries} attempts due to SSL errors")
-                    continue  # Skip this file
-            except Exception as e:
-                logger.error(f"Error downloading {file_name}: {str(e)}")
-                if attempt == max_retries - 1:
-                    continue  # Skip this file
+def _is_unchanged(file: dict, entry: Optional[dict]) -> bool:
+    if not entry or not os.path.exists(entry.get("path", "")):
+        return False
+    if file.get("md5Checksum") and entry.get("md5Checksum"):
+        return file["md5Checksum"] == entry["md5Checksum"]
+    return bool(file.get("modifiedTime")) and file.get("modifiedTime") == entry.get("modifiedTime")
 
-    logger.info(f"Downloaded {len(pdfs)} out of {len(files)} PDF files successfully")
-    return pdfs
 
+_FOLDER_LOCKS: Dict[str, threading.Lock] = {}
+_FOLDER_LOCKS_GUARD = threading.Lock()
 
-# =========================================================
-# TEXT EXTRACTION
-# =========================================================
-def extract_text_from_pdf_bytes(pdf_bytes: bytes, timeout_seconds: int = 10) -> str:
+
+def _folder_thread_lock(folder_id: str) -> threading.Lock:
+    with _FOLDER_LOCKS_GUARD:
+        return _FOLDER_LOCKS.setdefault(folder_id, threading.Lock())
+
+
+@contextmanager
+def drive_folder_lock(folder_id: str):
     """
-    Extract text from PDF bytes with timeout handling
+    Exclusive hold on a Drive folder's local cache, across threads and
+    processes. Syncing replaces changed blobs and removes stale ones, so
+    hold it from the sync until every yielded blob has been read.
     """
-    def _extract_with_timeout():
-        try:
-            # Try pdfminer first
-            temp_file = None
+    with _folder_thread_lock(folder_id):
+        folder_dir = _folder_cache_dir(folder_id)
+        os.makedirs(folder_dir, exist_ok=True)
+        with open(os.path.join(folder_dir, ".lock"), "a") as fh:
+            if fcntl:
+                fcntl.flock(fh, fcntl.LOCK_EX)
             try:
-                temp_file = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
-                temp_file.write(pdf_bytes)
-                temp_file.close()  # Close the file so pdfminer can read it
-
-                text = pdfminer.extract_text(temp_file.name) or ""
-                if text.strip():  # If we got meaningful text, return it
-                    os.unlink(temp_file.name)
-                    return text
-            except Exception:
-                pass
+                yield
             finally:
-                if temp_file and os.path.exists(temp_file.name):
-                    os.unlink(temp_file.name)
+                if fcntl:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def iter_pdfs_from_drive(
+    service,
+    folder_id: str,
+    files: Optional[List[dict]] = None,
+    timeout_seconds: int = 60,
+    max_retries: int = 5,
+    max_workers: int = DRIVE_DOWNLOAD_WORKERS,
+    service_factory: Optional[Callable[[], object]] = None,
+    on_event: Optional[EventCallback] = None
+) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (file_name, blob_path) for every PDF in a Drive folder as soon as
+    it is on local disk, with timeout and retry logic. Downloads are
+    streamed straight into the folder's blob directory; no PDF is held in
+    memory here.
+
+    A local manifest per folder records each file's md5Checksum,
+    modifiedTime and blob path, so only new or changed files are
+    downloaded; the rest are yielded first.
+
+    Files are downloaded concurrently by up to max_workers threads, with
+    at most 2 * max_workers downloads ahead of the consumer. The
+    googleapiclient service is not thread-safe, so pass service_factory to
+    give every download thread its own service; without it the given
+    service object is shared (fine for in-process fakes). Pass files when
+    the folder has already been listed.
+
+    Call within drive_folder_lock(folder_id) and keep holding it until
+    the consumer has read every yielded blob and the generator has been
+    closed or exhausted: its cleanup removes blobs the new manifest does
+    not reference and rewrites the manifest, which must not race another
+    sync of the folder.
+    """
+    logger.info(f"Fetching PDFs from folder {folder_id}")
 
-            # Fallback to PyPDF2 if pdfminer fails
-            try:
-                import PyPDF2
-                pdf_file = io.BytesIO(pdf_bytes)
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                if text.strip():
-                    return text
-            except Exception:
-                pass
-
-            # Fallback to PyMuPDF if available
-            try:
-                import fitz  # PyMuPDF
-                pdf_file = io.BytesIO(pdf_bytes)
-                doc = fitz.open(stream=pdf_file, filetype="pdf")
-                text = ""
-                for page in doc:
-                    text += page.get_text() + "\n"
-                if text.strip():
-                    return text
-            except Exception:
-                pass
-
-            # Final fallback: OCR for image-based PDFs
+    if files is None:
+        files = list_drive_pdfs(service, folder_id, fields="id, name, md5Checksum, modifiedTime")
+
+    if not files:
+        logger.warning(f"No PDF files found in folder {folder_id}")
+        return
+
+    manifest = _load_manifest(folder_id)
+    blob_dir = os.path.join(_folder_cache_dir(folder_id), "blobs")
+    os.makedirs(blob_dir, exist_ok=True)
+
+    to_download = [f for f in files if not _is_unchanged(f, manifest.get(f["id"]))]
+    logger.info(f"Found {len(files)} PDF files, {len(to_download)} new or changed")
+    emit(on_event, "listed", total=len(files), to_download=len(to_download))
+    downloaded = 0
+
+    local = threading.local()
+    stop = threading.Event()  # set when the consumer closes the generator early
+
+    def get_service():
+        if service_factory is None:
+            return service
+        if not hasattr(local, "service"):
+            local.service = service_factory()
+        return local.service
+
+    def sync_file(file: dict) -> Optional[dict]:
+        blob_path = os.path.join(blob_dir, f"{file['id']}.pdf")
+        if not _download_with_retry(get_service, file, blob_path, timeout_seconds, max_retries, stop):
+            return None
+        return {
+            "name": file["name"],
+            "md5Checksum": file.get("md5Checksum"),
+            "modifiedTime": file.get("modifiedTime"),
+            "path": blob_path,
+        }
+
+    download_ids = {f["id"] for f in to_download}
+    new_manifest = {
+        f["id"]: dict(manifest[f["id"]], name=f["name"])
+        for f in files if f["id"] not in download_ids
+    }
+
+    try:
+        for entry in list(new_manifest.values()):
+            downloaded += 1
+            emit(on_event, "downloaded", name=entry["name"], cached=True, downloaded=downloaded, total=len(files))
+            yield entry["name"], entry["path"]
+
+        if to_download:
+            executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+            queued = iter(to_download)
+            in_flight = {}
             try:
-                import pytesseract
-                from PIL import Image
-                import fitz  # Try to use PyMuPDF for image extraction
-
-                pdf_file = io.BytesIO(pdf_bytes)
-                doc = fitz.open(stream=pdf_file, filetype="pdf")
-                text = ""
-
-                for page_num in range(len(doc)):
-                    page = doc.load_page(page_num)
-                    pix = page.get_pixmap()
-                    img = Image.open(io.BytesIO(pix.tobytes()))
-                    page_text = pytesseract.image_to_string(img)
-                    text += page_text + "\n"
-
-                if text.strip():
-                    return text
-            except Exception:
-                pass
-
-            return ""
-        except Exception:
-            return ""
+                def submit_next() -> None:
+                    file = next(queued, None)
+                    if file is not None:
+                        in_flight[executor.submit(sync_file, file)] = file
+
+                for _ in range(2 * max(1, max_workers)):
+                    submit_next()
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        file = in_flight.pop(future)
+                        submit_next()
+                        entry = future.result()
+                        if entry is None:
+                            continue
+                        new_manifest[file["id"]] = entry
+                        downloaded += 1
+                        emit(on_event, "downloaded", name=entry["name"], cached=False, downloaded=downloaded, total=len(files))
+                        yield entry["name"], entry["path"]
+            finally:
+                # On an early close, skip queued downloads and stop retrying
+                # running ones; an attempt in progress still runs to its timeout
+                stop.set()
+                for future in in_flight:
+                    future.cancel()
+                executor.shutdown(wait=True)
+    finally:
+        # Drop blobs the new manifest does not reference: files that left the
+        # folder, changed files whose download failed, and leftover tmp files
+        kept = {entry["path"] for entry in new_manifest.values()}
+        for blob_name in os.listdir(blob_dir):
+            blob_path = os.path.join(blob_dir, blob_name)
+            if blob_path not in kept:
+                try:
+                    os.remove(blob_path)
+                except OSError:
+                    pass
+
+        _save_manifest(folder_id, new_manifest)
+        logger.info(f"Synced {downloaded} out of {len(files)} PDF files ({len(to_download)} new or changed)")
+
+
+def fetch_pdfs_from_drive(
+    service,
+    folder_id: str,
+    timeout_seconds: int = 60,
+    max_retries: int = 5,
+    max_workers: int = DRIVE_DOWNLOAD_WORKERS,
+    service_factory: Optional[Callable[[], object]] = None,
+    on_event: Optional[EventCallback] = None
+) -> Dict[str, str]:
+    """
+    Sync all PDF files from a Drive folder to local disk and return
+    {file_name: blob_path}; see iter_pdfs_from_drive. Call within
+    drive_folder_lock(folder_id) while the blobs are in use.
+    """
+    return dict(iter_pdfs_from_drive(
+        service,
+        folder_id,
+        timeout_seconds=timeout_seconds,
+        max_retries=max_retries,
+        max_workers=max_workers,
+        service_factory=service_factory,
+        on_event=on_event
+    ))
 
+
+# =========================================================
+# TEXT EXTRACTION
+# =========================================================
+def pdf_content_hash(source: PdfSource) -> str:
+    return sha256_file(source) if isinstance(source, str) else sha256_hex(source)
+
+
+def _extract_text_layer(source: PdfSource, timeout_seconds: int = EXTRACT_TIMEOUT_SECONDS) -> PdfExtraction:
+    """
+    Extract the text layer of a PDF (bytes or file path) with timeout
+    handling; also the unit of work run in extraction worker processes. On
+    timeout the pages parsed so far are kept and the extractor is "timeout".
+    """
+    extraction = PdfExtraction()
     try:
-        return run_with_timeout(_extract_with_timeout, timeout_seconds)
+        run_with_timeout(lambda: extract_pdf(source, extraction), timeout_seconds)
     except TimeoutError:
-        logger.warning(f"Text extraction timed out after {timeout_seconds} seconds")
-        return ""
+        extraction.cancel()
+        extraction.extractor = "timeout"
+        logger.warning(f"Text extraction timed out after {timeout_seconds} seconds ({len(extraction.pages)} pages kept)")
     except Exception as e:
         logger.error(f"Error during text extraction: {str(e)}")
-        return ""
+        extraction.pages = {}
+        extraction.extractor = "error"
+    return extraction
+
+
+def _ocr_missing_pages(source: PdfSource, extraction: PdfExtraction) -> None:
+    """
+    OCR the pages the text layer pass found empty, in the OCR pool and
+    within OCR_TIMEOUT_SECONDS rather than the text extraction budget
+    """
+    if extraction.extractor in ("timeout", "error") or extraction.ocr_pages == []:
+        return
+    if not ocr_available():
+        if not extraction.pages:
+            logger.warning("PDF has no text layer and OCR is unavailable (needs PyMuPDF, pytesseract and Pillow)")
+        return
+
+    started = time.perf_counter()
+    texts, outcome = ocr_pdf_pages(source, extraction.ocr_pages)
+    extraction.attempts.append(("ocr", outcome, time.perf_counter() - started))
+    extraction.pages.update(texts)
+    if outcome == "timeout":
+        extraction.extractor = "timeout"
+    elif extraction.extractor == "none" and texts:
+        extraction.extractor = "ocr"
+
+
+def extract_text_from_pdf_bytes(pdf_bytes: bytes, timeout_seconds: int = EXTRACT_TIMEOUT_SECONDS) -> str:
+    """
+    Extract text from PDF bytes with timeout handling
+    """
+    extraction = _extract_text_layer(pdf_bytes, timeout_seconds)
+    _ocr_missing_pages(pdf_bytes, extraction)
+    record_attempts(extraction.attempts)
+    return extraction.text
+
+
+_TEXT_CACHE = DiskCache(
+    os.path.join(CACHE_DIR, "resume_text"),
+    max_bytes=RESUME_TEXT_CACHE_MAX_MB * 1024 * 1024,
+)
+
+
+def _ocr_complete(extraction: PdfExtraction) -> bool:
+    if extraction.ocr_pages == []:
+        return True
+    return any(name == "ocr" and outcome in ("ok", "empty") for name, outcome, _ in extraction.attempts)
+
+
+def _store_extraction(key: str, text: str, extraction: PdfExtraction) -> None:
+    # Only cache definitive results: timeouts and crashes may be transient,
+    # and image-only pages that OCR missed (not installed, or failed) may
+    # read differently once it works
+    if not text or extraction.extractor in ("none", "timeout", "error") or not _ocr_complete(extraction):
+        return
+    _TEXT_CACHE.set(key, {
+        "text": text,
+        "extractor": extraction.extractor,
+        "extract_seconds": round(sum(seconds for _, _, seconds in extraction.attempts), 4),
+    })
+
+
+# A text layer pass yields either the cached cleaned text or a PdfExtraction
+# still to be finished (OCR, cleaning, caching) by _finish_extraction
+TextLayerResult = Tuple[str, Union[str, PdfExtraction]]
+
+
+def _finish_extraction(source: PdfSource, result: TextLayerResult) -> str:
+    key, extraction = result
+    if isinstance(extraction, str):
+        return extraction
+    _ocr_missing_pages(source, extraction)
+    record_attempts(extraction.attempts)
+    text = clean_text(extraction.text)
+    _store_extraction(key, text, extraction)
+    return text
+
+
+_EXTRACT_POOL: Optional[ProcessPoolExecutor] = None
+_EXTRACT_POOL_LOCK = threading.Lock()
+# One slot per pool worker: a task is only submitted once a worker is free,
+# so its timeout can be counted from submission even though the pool is
+# shared by concurrent rankings
+_EXTRACT_SLOTS = threading.BoundedSemaphore(max(1, EXTRACT_WORKERS))
+
+
+def _get_extract_pool() -> ProcessPoolExecutor:
+    global _EXTRACT_POOL
+    with _EXTRACT_POOL_LOCK:
+        if _EXTRACT_POOL is None:
+            _EXTRACT_POOL = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS)
+        return _EXTRACT_POOL
+
+
+def _reset_extract_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Replace a broken or stuck pool, killing its workers so a hung one does
+    not keep its process. Tasks other callers still have on it fail with
+    BrokenProcessPool and are recorded as failed extractions.
+    """
+    global _EXTRACT_POOL
+    with _EXTRACT_POOL_LOCK:
+        if _EXTRACT_POOL is pool:
+            terminate_pool(pool)
+            _EXTRACT_POOL = None
+
+
+def _failed_extraction() -> PdfExtraction:
+    extraction = PdfExtraction()
+    extraction.extractor = "error"
+    return extraction
+
+
+def _submit_to_slot(pool: ProcessPoolExecutor, fn, *args) -> Tuple[Future, Callable[[], None]]:
+    """
+    Submit once a slot is free. Returns the future and an idempotent
+    release for its slot, which also runs when the future completes.
+    """
+    _EXTRACT_SLOTS.acquire()
+    released = []
+    guard = threading.Lock()
+
+    def release(_=None) -> None:
+        with guard:
+            if released:
+                return
+            released.append(True)
+        _EXTRACT_SLOTS.release()
+
+    try:
+        future = pool.submit(fn, *args)
+    except BaseException:
+        release()
+        raise
+    future.add_done_callback(release)
+    return future, release
+
+
+def _text_layer_in_pool(source: PdfSource, key: str, timeout_seconds: int = EXTRACT_TIMEOUT_SECONDS) -> TextLayerResult:
+    """
+    Text layer of one PDF, whose content hash is key: from the cache, or
+    parsed in the shared process pool (EXTRACT_WORKERS). Each worker
+    enforces timeout_seconds on its own main thread. File paths are sent to
+    the workers as-is, so the PDF is never pickled across the process
+    boundary. Pool failures only fail this PDF.
+    """
+    cached = _TEXT_CACHE.get(key)
+    if cached is not None:
+        return key, cached["text"]
+
+    if EXTRACT_WORKERS <= 1:
+        return key, _extract_text_layer(source, timeout_seconds)
+
+    pool = _get_extract_pool()
+    try:
+        future, release = _submit_to_slot(pool, _extract_text_layer, source, timeout_seconds)
+    except BrokenProcessPool:
+        logger.error("Extraction pool is broken; resetting pool")
+        _reset_extract_pool(pool)
+        return key, _failed_extraction()
+    try:
+        # Backstop in case a worker gets stuck inside native code where the
+        # alarm cannot interrupt it
+        return key, future.result(timeout=timeout_seconds + 30)
+    except FuturesTimeoutError:
+        logger.error("Extraction worker stuck past its timeout; resetting pool")
+        release()  # free the slot now; the reset kills the stuck worker
+        _reset_extract_pool(pool)
+    except (BrokenProcessPool, CancelledError) as e:
+        logger.error(f"Extraction pool failed ({type(e).__name__}); resetting pool")
+        _reset_extract_pool(pool)
+    except Exception as e:
+        logger.error(f"Extraction worker failed: {str(e)}")
+    return key, _failed_extraction()
+
+
+def _add_extract_stages(
+    pipeline: Pipeline,
+    timeout_seconds: int = EXTRACT_TIMEOUT_SECONDS,
+    on_event: Optional[EventCallback] = None
+) -> Pipeline:
+    """
+    Turn (name, pdf) items into (name, cleaned_text). OCR gets a stage of
+    its own so scanned resumes wait on the OCR pool without holding up the
+    text extraction workers; PDFs with a text layer pass straight through.
+
+    A PDF that cannot be read is logged, reported as a "skipped" event and
+    dropped; only errors outside a single PDF stop the pipeline.
+    """
+    def skip(name: str, error: Exception) -> None:
+        logger.error(f"Skipping {name}: {type(error).__name__}: {str(error)}")
+        emit(on_event, "skipped", name=name, reason=str(error))
+
+    def extract(item):
+        name, source = item
+        try:
+            key = pdf_content_hash(source)
+        except OSError as e:  # blob missing or unreadable
+            skip(name, e)
+            return None
+        return name, source, _text_layer_in_pool(source, key, timeout_seconds)
+
+    def ocr(item):
+        name, source, result = item
+        try:
+            return name, _finish_extraction(source, result)
+        except OSError as e:
+            skip(name, e)
+            return None
+
+    return (
+        pipeline
+        .stage("extract", extract, workers=EXTRACT_WORKERS)
+        .stage("ocr", ocr, workers=EXTRACT_WORKERS)
+    )
+
+
+def iter_extracted_resumes(
+    resumes: Union[Dict[str, PdfSource], Iterable[Tuple[str, PdfSource]]],
+    timeout_seconds: int = EXTRACT_TIMEOUT_SECONDS
+) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (resume_name, cleaned_text) as each PDF finishes parsing.
+
+    resumes may be a dict or any iterable of (name, pdf bytes or path), such
+    as iter_pdfs_from_drive; it is consumed lazily, at most EXTRACT_WORKERS
+    PDFs are parsed at once, and results come out in completion order.
+    """
+    items = resumes.items() if isinstance(resumes, dict) else resumes
+    yield from _add_extract_stages(Pipeline(items), timeout_seconds)
 
 
 def clean_text(text: str) -> str:
@@ -513,6 +864,134 @@ def extract_relevant_sections(text: str, role_category: str = "general") -> str:
     return "\n".join(sections) if sections else text
 
 
+# =========================================================
+# BI-ENCODER SCORING
+# =========================================================
+def cosine_similarity_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise cosine similarity between the rows of a and the rows of b
+    """
+    a = a / np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-12, None)
+    b = b / np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-12, None)
+    return a @ b.T
+
+
+def bi_encoder_scores(
+    embed_model,
+    jd_emb: np.ndarray,
+    resume_texts: Dict[str, str],
+    batch_size: int = BI_ENCODER_BATCH_SIZE
+) -> Tuple[Dict[str, float], Dict[str, List[Tuple[str, float]]]]:
+    """
+    Best chunk similarity per resume, plus (chunk, similarity) for every
+    chunk of every resume in chunk order. Chunks from every resume are
+    encoded in one batched call and the per-resume best is a segmented max
+    over the flat similarity vector. Resumes without chunks score 0.0.
+    """
+    chunk_scores = {name: [] for name in resume_texts}
+    scores = {name: 0.0 for name in resume_texts}
+
+    names, offsets, all_chunks = [], [], []
+    for name, text in resume_texts.items():
+        chunks = chunk_text(text)
+        if not chunks:
+            continue
+        names.append(name)
+        offsets.append(len(all_chunks))
+        all_chunks.extend(chunks)
+
+    if not all_chunks:
+        return scores, chunk_scores
+
+    embs = encode_with_store(embed_model, embed_store_name(embed_model), all_chunks, batch_size=batch_size)
+    sims = cosine_similarity_matrix(np.atleast_2d(jd_emb), embs)[0]
+    best = np.maximum.reduceat(sims, offsets)
+
+    bounds = offsets + [len(all_chunks)]
+    for i, name in enumerate(names):
+        scores[name] = float(best[i])
+        chunk_scores[name] = [
+            (chunk, float(sim))
+            for chunk, sim in zip(all_chunks[bounds[i]:bounds[i + 1]], sims[bounds[i]:bounds[i + 1]])
+        ]
+    return scores, chunk_scores
+
+
+def best_chunks(chunk_scores: List[Tuple[str, float]], n: int = CROSS_ENCODER_CHUNKS_PER_CANDIDATE) -> List[str]:
+    return [chunk for chunk, _ in sorted(chunk_scores, key=lambda c: c[1], reverse=True)[:n]]
+
+
+# =========================================================
+# CROSS-ENCODER SCORING
+# =========================================================
+def _truncate_to_tokens(tokenizer, text: str, max_tokens: int) -> Tuple[str, int]:
+    """
+    Cut text to at most max_tokens model tokens. Returns the (possibly
+    shortened) text and the token count of the original.
+    """
+    if tokenizer is None:
+        # No tokenizer exposed: assume ~0.75 words per token
+        words = text.split()
+        max_words = max(1, int(max_tokens * 0.75))
+        return " ".join(words[:max_words]), int(len(words) / 0.75)
+
+    ids = tokenizer(text, add_special_tokens=False)["input_ids"]
+    if len(ids) <= max_tokens:
+        return text, len(ids)
+    return tokenizer.decode(ids[:max_tokens]), len(ids)
+
+
+def cross_encoder_scores(
+    cross_model,
+    jd_text: str,
+    candidate_chunks: Dict[str, List[str]],
+    batch_size: int = CROSS_ENCODER_BATCH_SIZE,
+    max_tokens: int = CROSS_ENCODER_MAX_TOKENS
+) -> Tuple[Dict[str, float], dict]:
+    """
+    Score every (JD, chunk) pair in one batched predict and keep the best
+    chunk per candidate. The JD and chunks are cut to fit max_tokens up
+    front, so nothing is silently dropped by the model's own truncation.
+
+    Returns ({name: sigmoid score}, input length stats).
+    """
+    tokenizer = getattr(cross_model, "tokenizer", None)
+    max_length = min(max_tokens, getattr(cross_model, "max_length", None) or max_tokens)
+    special_tokens = 3  # [CLS] jd [SEP] chunk [SEP]
+
+    jd_part, jd_tokens = _truncate_to_tokens(tokenizer, jd_text, min(CROSS_ENCODER_JD_TOKENS, max_length // 2))
+    jd_used = min(jd_tokens, CROSS_ENCODER_JD_TOKENS, max_length // 2)
+    chunk_budget = max_length - jd_used - special_tokens
+
+    pairs, offsets, names, input_tokens = [], [], [], []
+    truncated = 0
+    for name, chunks in candidate_chunks.items():
+        if not chunks:
+            continue
+        names.append(name)
+        offsets.append(len(pairs))
+        for chunk in chunks:
+            chunk_part, chunk_tokens = _truncate_to_tokens(tokenizer, chunk, chunk_budget)
+            truncated += chunk_tokens > chunk_budget
+            input_tokens.append(jd_used + min(chunk_tokens, chunk_budget) + special_tokens)
+            pairs.append((jd_part, chunk_part))
+
+    stats = {
+        "pairs": len(pairs),
+        "max_input_tokens": max(input_tokens, default=0),
+        "mean_input_tokens": round(float(np.mean(input_tokens)), 1) if input_tokens else 0.0,
+        "truncated_chunks": int(truncated),
+        "jd_tokens": jd_tokens,
+    }
+    if not pairs:
+        return {}, stats
+
+    logits = np.asarray(cross_model.predict(pairs, batch_size=batch_size), dtype=np.float32).reshape(-1)
+    probs = 1 / (1 + np.exp(-logits))  # sigmoid
+    best = np.maximum.reduceat(probs, offsets)
+    return {name: float(score) for name, score in zip(names, best)}, stats
+
+
 # =========================================================
 # RANKING PIPELINE
 # =========================================================
@@ -526,42 +1005,118 @@ def classify_match_by_rank(rank: int, total: int) -> str:
 
 def rank_resumes_against_jd(
     jd_text: str,
-    resumes: Dict[str, bytes],
-    top_k: int = 7
+    resumes: Union[Dict[str, PdfSource], Iterable[Tuple[str, PdfSource]]],
+    top_k: int = 7,
+    on_event: Optional[EventCallback] = None,
+    total: Optional[int] = None,
+    cancel: Optional[threading.Event] = None
 ) -> List[Dict]:
+    """
+    Rank resumes against a JD as a staged pipeline:
+
+        source (dict or e.g. iter_pdfs_from_drive, DRIVE_DOWNLOAD_WORKERS)
+          -> extract (EXTRACT_WORKERS) -> section (PIPELINE_SECTION_WORKERS)
+          -> embed (this thread, micro-batched) -> cross-score (top_k)
+
+    Stages are joined by bounded queues (PIPELINE_QUEUE_SIZE), so only a
+    handful of PDFs are in memory at once however large the folder is.
+    Embedding stays on this thread rather than being a worker stage: it
+    batches chunks across resumes, which needs a single collection point,
+    and one forward pass already uses every core through the model's
+    intra-op threads, so parallel embed workers would only contend.
+    Cross-scoring needs every bi-encoder score, so it runs once the other
+    stages have drained. total is the number of resumes, for progress
+    events, when resumes is not a dict.
+
+    Setting cancel stops the pipeline and skips the stages not yet started;
+    the call then raises PipelineCancelled.
+    """
+    if isinstance(resumes, dict):
+        total = len(resumes)
+        resumes = resumes.items()
 
     # Detect role type
     role_category = role_category_detection(jd_text)
     weights = calculate_dynamic_weights(role_category)
 
-    embed_model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
-    cross_model = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2")
+    embed_model = get_embed_model()
+    cross_model = get_cross_model()
 
     jd_text = clean_text(jd_text)
     jd_keywords = extract_role_keywords(jd_text)
-    jd_emb = embed_model.encode(jd_text, convert_to_tensor=True)
+    keyword_matcher = KeywordMatcher(jd_keywords)
+    jd_mentions_experience = "year" in jd_text.lower() or "experience" in jd_text.lower()
+    jd_exp_level = extract_experience_level(jd_text)
+    jd_emb = encode_with_store(embed_model, embed_store_name(embed_model), [jd_text])[0]
 
     resume_texts = {}
     candidate_names = {}
-    candidate_summaries = {}
-    for name, pdf_bytes in resumes.items():
-        full_text = extract_text_from_pdf_bytes(pdf_bytes)
-        full_text = clean_text(full_text)
-        candidate_name = extract_candidate_name(full_text)
-        summary = extract_candidate_summary(full_text)
+    summary_sources = {}
+    bi_scores = {}
+    candidate_chunks = {}
+
+    # Resumes are bi-encoder scored in micro-batches of about
+    # BI_ENCODER_BATCH_SIZE chunks while extraction is still running, or
+    # sooner if nothing new arrives for PIPELINE_FLUSH_SECONDS, so scores
+    # can be streamed before the whole folder is parsed
+    pending = {}
+    pending_chunks = 0
+
+    def flush_pending():
+        scores, chunk_scores = bi_encoder_scores(embed_model, jd_emb, pending)
+        for scored_name, score in scores.items():
+            bi_scores[scored_name] = score
+            candidate_chunks[scored_name] = best_chunks(chunk_scores[scored_name])
+            emit(
+                on_event, "scored",
+                name=scored_name,
+                candidate_name=candidate_names[scored_name],
+                bi_score=round(score, 4),
+                scored=len(bi_scores),
+                total=total
+            )
+        pending.clear()
+
+    def section(item):
+        name, full_text = item
         text = extract_relevant_sections(full_text, role_category)
-        resume_texts[name] = text
-        candidate_names[name] = candidate_name
-        candidate_summaries[name] = summary
+        # extract_candidate_summary only reads the first 2000 chars
+        return name, extract_candidate_name(full_text), text, full_text[:2000], len(chunk_text(text))
 
-    bi_scores = {}
-    for name, text in resume_texts.items():
-        chunks = chunk_text(text)
-        if not chunks:
-            bi_scores[name] = 0.0
-        else:
-            embs = embed_model.encode(chunks, convert_to_tensor=True)
-            bi_scores[name] = float(util.cos_sim(jd_emb, embs).max())
+    pipeline = (
+        _add_extract_stages(Pipeline(resumes, cancel=cancel), on_event=on_event)
+        .stage("section", section, workers=PIPELINE_SECTION_WORKERS)
+    )
+    items = pipeline.results(idle_timeout=PIPELINE_FLUSH_SECONDS)
+    try:
+        for item in items:
+            if item is None:
+                # Upstream is busy; score what has arrived so far
+                if pending:
+                    flush_pending()
+                    pending_chunks = 0
+                continue
+
+            name, candidate_name, text, summary_source, n_chunks = item
+            resume_texts[name] = text
+            candidate_names[name] = candidate_name
+            summary_sources[name] = summary_source
+            emit(on_event, "extracted", name=name, extracted=len(resume_texts), total=total)
+
+            pending[name] = text
+            pending_chunks += n_chunks
+            if pending_chunks >= BI_ENCODER_BATCH_SIZE:
+                flush_pending()
+                pending_chunks = 0
+    finally:
+        items.close()  # stops and joins the pipeline threads if scoring failed
+
+    if pending:
+        flush_pending()
+
+    if not bi_scores:
+        return []
+    check_cancelled(cancel)
 
     top_candidates = sorted(
         bi_scores.items(),
@@ -569,17 +1124,23 @@ def rank_resumes_against_jd(
         reverse=True
     )[:top_k]
 
-    pairs = [(jd_text, resume_texts[name]) for name, _ in top_candidates]
-    cross_scores = cross_model.predict(pairs)
-
-    cross_scores = np.array(cross_scores)
-    cross_norm = 1 / (1 + np.exp(-cross_scores))  # sigmoid
+    # The cross-encoder reads each candidate's best bi-encoder chunks rather
+    # than the whole section text, which would be truncated at 512 tokens
+    cross_scores, cross_stats = cross_encoder_scores(
+        cross_model, jd_text, {name: candidate_chunks[name] for name, _ in top_candidates}
+    )
+    logger.info(f"Cross-encoder input: {cross_stats}")
 
     final_results = []
-    for (name, bi), cross in zip(top_candidates, cross_norm):
+    for name, bi in top_candidates:
+        cross = cross_scores.get(name, 0.0)
+        # One keyword scan per resume, shared by boost, strengths and gaps
+        hits = keyword_matcher.scan(resume_texts[name])
+
         # Calculate all components
-        boost = jd_keyword_boost(resume_texts[name], jd_keywords)
-        exp_level = extract_experience_level(resume_texts[name])
+        boost = jd_keyword_boost(resume_texts[name], jd_keywords, hits)
+        profile = extract_profile(resume_texts[name])
+        exp_level = profile.experience_level
 
         # Weighted scoring with role-specific weights
         final_score = (
@@ -589,14 +1150,14 @@ def rank_resumes_against_jd(
         )
 
         # Optional: Adjust for seniority if JD mentions experience
-        if "year" in jd_text.lower() or "experience" in jd_text.lower():
-            exp_match = 1.0 - abs(exp_level - extract_experience_level(jd_text))
+        if jd_mentions_experience:
+            exp_match = 1.0 - abs(exp_level - jd_exp_level)
             final_score = 0.8 * final_score + 0.2 * exp_match
 
         # Extract additional fields
-        exp_summary = extract_experience_summary(resume_texts[name])
-        strengths = extract_strengths(resume_texts[name], jd_keywords)
-        gaps = extract_gaps(resume_texts[name], jd_keywords)
+        exp_summary = profile.experience_summary
+        strengths = extract_strengths(resume_texts[name], jd_keywords, hits)
+        gaps = extract_gaps(resume_texts[name], jd_keywords, hits)
 
         final_results.append({
             "rank": 0,  # Will be updated later
@@ -604,18 +1165,14 @@ def rank_resumes_against_jd(
             "score": round(float(final_score), 4),
             "candidate_name": candidate_names[name],
             "role_category": role_category,
-            "experience_level": extract_experience_level(resume_texts[name]),
-            "matched_keywords": [
-                kw for kw in jd_keywords if kw in resume_texts[name].lower()
-            ][:10],
+            "experience_level": exp_level,
+            "matched_keywords": hits.matched()[:10],
             "status": classify_match_by_rank(0, 1),  # Will be updated later
             "candidate_summary": {
                 "ucid": f"UCID-{name[:8]}",
                 "job_id": "JOB-001",
                 "fit_score": round(float(final_score), 4),
-                "key_skills": [
-                    kw for kw in jd_keywords if kw in resume_texts[name].lower()
-                ][:10],
+                "key_skills": hits.matched()[:10],
                 "experience_summary": exp_summary,
                 "strengths": strengths,
                 "gaps": gaps,
@@ -626,10 +1183,17 @@ def rank_resumes_against_jd(
     # Sort by score in descending order
     final_results.sort(key=lambda x: x["score"], reverse=True)
 
+    # LLM summaries only for candidates that made the cut
+    check_cancelled(cancel)
+    summaries = summarize_candidates({r["resume_name"]: summary_sources[r["resume_name"]] for r in final_results})
+    for result in final_results:
+        result["summary"] = summaries.get(result["resume_name"])
+
     # Update ranks and status after sorting
     for i, result in enumerate(final_results, start=1):
         result["rank"] = i
         result["status"] = classify_match_by_rank(i, len(final_results))
         result["candidate_summary"]["screening_decision"] = classify_match_by_rank(i, len(final_results))
 
+    emit(on_event, "reranked", ranked=len(final_results), cross_encoder=cross_stats)
     return final_results
@@ -0,0 +1,319 @@
+import logging
+import os
+import sqlite3
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from app.config import (
+    TALENT_POOL_DB_PATH, TALENT_POOL_INDEX_DIR, TALENT_POOL_NLIST, TALENT_POOL_NPROBE,
+    CROSS_ENCODER_CHUNKS_PER_CANDIDATE,
+)
+from app.services.embedding_store import encode_with_store
+from app.services.events import EventCallback, emit
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.model_registry import get_embed_model, get_cross_model, embed_store_name
+from app.services.pdf_extraction import PdfSource
+from app.services.resume_extractors import extract_profile
+from app.services.resume_ranker import (
+    pdf_content_hash, iter_extracted_resumes, extract_relevant_sections,
+    chunk_text, clean_text, extract_role_keywords, role_category_detection, calculate_dynamic_weights, cross_encoder_scores,
+    classify_match_by_rank, drive_folder_lock, extract_folder_id, get_drive_service, iter_pdfs_from_drive,
+)
+from app.services.ranking_service import CREDENTIALS_PATH
+from app.services.vector_index import IVFIndex
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# STANDING TALENT POOL
+# =========================================================
+# Resumes are ingested once and searched with any JD. Chunk embeddings live
+# in an IVF index; SQLite maps index rows back to resumes and keeps the
+# section text needed for re-ranking. A resume's id is a hash of its PDF,
+# so re-ingesting the same file is a no-op.
+#
+# A resume's vectors are added to the index hidden, its SQLite rows are
+# committed, and only then are the vectors made live. A crash in between
+# leaves either hidden vectors nothing refers to, which search never sees,
+# or committed rows whose vectors are still hidden, which _get_index()
+# publishes on first use.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    resume_id TEXT PRIMARY KEY,
+    resume_name TEXT NOT NULL,
+    candidate_name TEXT NOT NULL,
+    text TEXT NOT NULL,
+    source TEXT,
+    embed_model TEXT NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    vector_row INTEGER PRIMARY KEY,
+    resume_id TEXT NOT NULL,
+    chunk TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chunks_resume_id ON chunks(resume_id);
+"""
+
+_local = threading.local()
+_index: Optional[IVFIndex] = None
+_index_lock = threading.Lock()
+_write_lock = threading.Lock()
+
+
+def _conn() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(TALENT_POOL_DB_PATH) or ".", exist_ok=True)
+        conn = sqlite3.connect(TALENT_POOL_DB_PATH, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def _get_index() -> IVFIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            index = IVFIndex(TALENT_POOL_INDEX_DIR, nlist=TALENT_POOL_NLIST, nprobe=TALENT_POOL_NPROBE)
+            _publish_committed_rows(index)
+            _index = index
+        return _index
+
+
+def _publish_committed_rows(index: IVFIndex) -> None:
+    """
+    Make live any vectors whose chunks were committed by an ingest that
+    stopped before it could publish them
+    """
+    rows = [row["vector_row"] for row in _conn().execute("SELECT vector_row FROM chunks")]
+    published = index.set_live(rows)
+    if published:
+        logger.warning(f"Talent pool: published {published} vectors left hidden by an interrupted ingest")
+
+
+class EmbedModelMismatch(RuntimeError):
+    pass
+
+
+def _check_embed_model(conn: sqlite3.Connection, store_name: str) -> None:
+    """
+    The pool's vectors are only comparable with vectors from the model that
+    made them; refuse to mix in or search with another one
+    """
+    row = conn.execute("SELECT embed_model FROM resumes WHERE embed_model != ? LIMIT 1", (store_name,)).fetchone()
+    if row is not None:
+        raise EmbedModelMismatch(
+            f"Talent pool was built with {row['embed_model']} but the current embedding model is {store_name}; "
+            "delete TALENT_POOL_DB_PATH and TALENT_POOL_INDEX_DIR and re-ingest to switch models"
+        )
+
+
+def resume_id_for(pdf: PdfSource) -> str:
+    return f"RES-{pdf_content_hash(pdf)[:16].upper()}"
+
+
+def ingest_resumes(
+    resumes: Union[Dict[str, PdfSource], Iterable[Tuple[str, PdfSource]]],
+    source: Optional[str] = None,
+    on_event: Optional[EventCallback] = None
+) -> dict:
+    """
+    Extract, chunk, embed and index PDFs (bytes or local paths), given as
+    a dict or as (name, pdf) pairs; names need not be unique. Resumes
+    already in the pool (same file content) are skipped.
+    """
+    conn = _conn()
+    resumes = list(resumes.items() if isinstance(resumes, dict) else resumes)
+    ids = [resume_id_for(data) for _, data in resumes]
+    unique_ids = list(dict.fromkeys(ids))
+    placeholders = ",".join("?" * len(unique_ids))
+    existing = {
+        row["resume_id"] for row in conn.execute(
+            f"SELECT resume_id FROM resumes WHERE resume_id IN ({placeholders})", unique_ids
+        )
+    } if unique_ids else set()
+    # Work is keyed by resume id, so the same file under two names is
+    # ingested once and two files with the same name are both ingested
+    pending, names = {}, {}
+    for (name, data), resume_id in zip(resumes, ids):
+        if resume_id not in existing and resume_id not in pending:
+            pending[resume_id] = data
+            names[resume_id] = name
+
+    embed_model = get_embed_model()
+    store_name = embed_store_name(embed_model)
+    _check_embed_model(conn, store_name)
+    index = _get_index()
+
+    ingested, skipped = [], len(resumes) - len(pending)
+    for resume_id, full_text in iter_extracted_resumes(pending):
+        name = names[resume_id]
+        text = extract_relevant_sections(full_text)
+        chunks = chunk_text(text)
+        if not chunks:
+            skipped += 1
+            continue
+        vectors = encode_with_store(embed_model, store_name, chunks)
+
+        # One writer per process; the index has its own cross-process lock.
+        # The vectors stay hidden until the rows that refer to them are
+        # committed (see the note at the top of this section)
+        with _write_lock:
+            rows = index.add(vectors, live=False)
+            conn.execute("BEGIN")
+            try:
+                added = conn.execute(
+                    "INSERT OR IGNORE INTO resumes (resume_id, resume_name, candidate_name, text, source, embed_model, ingested_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (resume_id, name, extract_profile(full_text).candidate_name, text, source, store_name, datetime.now().isoformat())
+                ).rowcount
+                if added:
+                    conn.executemany(
+                        "INSERT INTO chunks (vector_row, resume_id, chunk) VALUES (?, ?, ?)",
+                        [(row, resume_id, chunk) for row, chunk in zip(rows, chunks)]
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            if added:
+                index.set_live(rows)
+        if not added:
+            skipped += 1  # another worker ingested the same file meanwhile
+            continue
+        ingested.append(resume_id)
+        emit(on_event, "ingested", name=name, resume_id=resume_id, ingested=len(ingested), total=len(pending))
+
+    logger.info(f"Talent pool ingest: {len(ingested)} added, {skipped} skipped")
+    return {"ingested": len(ingested), "skipped": skipped, "resume_ids": ingested}
+
+
+def ingest_drive_folder(drive_folder_url: str, on_event: Optional[EventCallback] = None) -> dict:
+    """
+    Ingest every PDF in a Drive folder. Raises ValueError for an invalid
+    folder URL and RuntimeError when Google credentials are not configured.
+    """
+    folder_id = extract_folder_id(drive_folder_url)
+    if not os.path.exists(CREDENTIALS_PATH):
+        raise RuntimeError("Google credentials not configured")
+
+    service = get_drive_service(CREDENTIALS_PATH)
+    with drive_folder_lock(folder_id):
+        # Pairs rather than a dict: Drive allows two files with one name
+        pdfs = list(iter_pdfs_from_drive(
+            service,
+            folder_id,
+            service_factory=lambda: get_drive_service(CREDENTIALS_PATH),
+            on_event=on_event
+        ))
+        return ingest_resumes(pdfs, source=f"drive:{folder_id}", on_event=on_event)
+
+
+def delete_resume(resume_id: str) -> bool:
+    conn = _conn()
+    with _write_lock:
+        rows = [row["vector_row"] for row in conn.execute("SELECT vector_row FROM chunks WHERE resume_id = ?", (resume_id,))]
+        deleted = conn.execute("DELETE FROM resumes WHERE resume_id = ?", (resume_id,)).rowcount
+        conn.execute("DELETE FROM chunks WHERE resume_id = ?", (resume_id,))
+        _get_index().delete(rows)
+    return bool(deleted)
+
+
+def get_pool_stats() -> dict:
+    index = _get_index()
+    return {
+        "resumes": _conn().execute("SELECT COUNT(*) FROM resumes").fetchone()[0],
+        "chunks": index.live_count(),
+        "index_trained": index.trained,
+        "index_lists": TALENT_POOL_NLIST if index.trained else 0,
+        "nprobe": TALENT_POOL_NPROBE,
+    }
+
+
+def search_talent_pool(jd_text: str, top_k: int = 10, candidates: int = 50) -> List[dict]:
+    """
+    Retrieve the closest `candidates` resumes from the pool by chunk
+    similarity, then re-rank them with the cross-encoder and keyword match
+    the same way rank_resumes_against_jd does
+    """
+    role_category = role_category_detection(jd_text)
+    weights = calculate_dynamic_weights(role_category)
+
+    embed_model = get_embed_model()
+    cross_model = get_cross_model()
+
+    jd_text = clean_text(jd_text)
+    keyword_matcher = KeywordMatcher(extract_role_keywords(jd_text))
+    jd_mentions_experience = "year" in jd_text.lower() or "experience" in jd_text.lower()
+    jd_exp_level = extract_profile(jd_text).experience_level
+    store_name = embed_store_name(embed_model)
+    _check_embed_model(_conn(), store_name)
+    jd_emb = encode_with_store(embed_model, store_name, [jd_text])[0]
+
+    # Several chunks can come from one resume, so over-fetch chunks
+    rows, sims = _get_index().search(jd_emb, k=candidates * CROSS_ENCODER_CHUNKS_PER_CANDIDATE * 2)
+    if not len(rows):
+        return []
+    similarity = dict(zip(rows.tolist(), sims.tolist()))
+
+    conn = _conn()
+    chunk_rows = conn.execute(
+        f"SELECT vector_row, resume_id, chunk FROM chunks WHERE vector_row IN ({','.join('?' * len(similarity))})",
+        list(similarity)
+    ).fetchall()
+
+    retrieved = defaultdict(list)
+    for row in chunk_rows:
+        retrieved[row["resume_id"]].append((similarity[row["vector_row"]], row["chunk"]))
+    bi_scores = {resume_id: max(sim for sim, _ in chunks) for resume_id, chunks in retrieved.items()}
+    shortlist = sorted(bi_scores, key=bi_scores.get, reverse=True)[:candidates]
+
+    candidate_chunks = {
+        resume_id: [chunk for _, chunk in sorted(retrieved[resume_id], reverse=True)[:CROSS_ENCODER_CHUNKS_PER_CANDIDATE]]
+        for resume_id in shortlist
+    }
+    cross_scores, cross_stats = cross_encoder_scores(cross_model, jd_text, candidate_chunks)
+    logger.info(f"Talent pool search: {len(rows)} chunks, {len(shortlist)} candidates, cross-encoder input {cross_stats}")
+
+    resumes = {
+        row["resume_id"]: row for row in conn.execute(
+            f"SELECT resume_id, resume_name, candidate_name, text FROM resumes WHERE resume_id IN ({','.join('?' * len(shortlist))})",
+            shortlist
+        )
+    }
+
+    results = []
+    for resume_id in shortlist:
+        resume = resumes.get(resume_id)
+        if resume is None:
+            continue  # deleted while searching
+        hits = keyword_matcher.scan(resume["text"])
+        bi, cross = bi_scores[resume_id], cross_scores.get(resume_id, 0.0)
+        score = weights["bi_encoder"] * bi + weights["cross_encoder"] * cross + weights["keywords"] * hits.boost()
+        if jd_mentions_experience:
+            exp_match = 1.0 - abs(extract_profile(resume["text"]).experience_level - jd_exp_level)
+            score = 0.8 * score + 0.2 * exp_match
+        results.append({
+            "rank": 0,
+            "resume_id": resume_id,
+            "resume_name": resume["resume_name"],
+            "candidate_name": resume["candidate_name"],
+            "score": round(float(score), 4),
+            "bi_score": round(bi, 4),
+            "cross_score": round(cross, 4),
+            "matched_keywords": hits.matched()[:10],
+            "status": "",
+        })
+
+    results.sort(key=lambda r: r["score"], reverse=True)
+    results = results[:top_k]
+    for i, result in enumerate(results, start=1):
+        result["rank"] = i
+        result["status"] = classify_match_by_rank(i, len(results))
+    return results
@@ -0,0 +1,299 @@
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.config import EMBED_STORE_DTYPE
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# IVF APPROXIMATE NEAREST-NEIGHBOUR INDEX
+# =========================================================
+# Files in the index directory, all indexed by row number:
+#   meta.json       dim, dtype, row count, training state, write version
+#   vectors.bin     unit-normalised vectors (memory-mapped, append-only)
+#   lists.bin       int32 inverted-list id per row, -1 before training
+#   live.bin        uint8 per row, 0 until published and once deleted
+#   centroids.npy   nlist x dim coarse quantiser
+# Rows are never reused; deleting only clears the live flag, and search
+# skips dead rows. Rows added with live=False stay hidden until set_live(),
+# so a caller can record them elsewhere first. Until enough vectors exist
+# to train the quantiser the index answers queries by brute force.
+
+_SEARCH_BLOCK_ROWS = 65536
+_KMEANS_ITERATIONS = 10
+_KMEANS_SAMPLES_PER_LIST = 64
+_RETRAIN_GROWTH = 4  # retrain once the index has grown this many times over
+
+
+class IVFIndex:
+    """
+    Inner-product (cosine) IVF index over NumPy with incremental add and
+    delete, shared between processes through the files on disk.
+    """
+
+    def __init__(self, directory: str, nlist: int = 256, nprobe: int = 16, dtype: str = EMBED_STORE_DTYPE):
+        self.directory = directory
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.dtype = np.dtype(dtype)
+        self.dim: Optional[int] = None
+        self.count = 0
+        self.trained_count = 0
+        self.version = -1
+
+        self._vectors: Optional[np.memmap] = None
+        self._list_ids: Optional[np.memmap] = None
+        self._live: Optional[np.memmap] = None
+        self._capacity = 0
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+        self._lock = threading.RLock()
+
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._vectors_path = os.path.join(directory, "vectors.bin")
+        self._lists_path = os.path.join(directory, "lists.bin")
+        self._live_path = os.path.join(directory, "live.bin")
+        self._centroids_path = os.path.join(directory, "centroids.npy")
+        self._lock_path = os.path.join(directory, ".lock")
+
+        self._refresh()
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    def live_count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return int(self._live[:self.count].sum()) if self.count else 0
+
+    # -----------------------------------------------------
+    # file handling
+    # -----------------------------------------------------
+    @contextmanager
+    def _file_lock(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._lock_path, "a") as fh:
+            if fcntl:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _open_arrays(self, min_rows: int) -> None:
+        row_bytes = self.dim * self.dtype.itemsize
+        size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        capacity = size // row_bytes
+        if capacity < min_rows:
+            capacity = max(min_rows, capacity * 2, 1024)
+            for path, width in ((self._vectors_path, row_bytes), (self._lists_path, 4), (self._live_path, 1)):
+                with open(path, "ab") as f:
+                    f.truncate(capacity * width)
+        if self._vectors is None or capacity != self._capacity:
+            self._vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode="r+", shape=(capacity, self.dim))
+            self._list_ids = np.memmap(self._lists_path, dtype=np.int32, mode="r+", shape=(capacity,))
+            self._live = np.memmap(self._live_path, dtype=np.uint8, mode="r+", shape=(capacity,))
+            self._capacity = capacity
+
+    def _write_meta(self) -> None:
+        self.version += 1
+        tmp_path = f"{self._meta_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "dim": self.dim,
+                "dtype": self.dtype.name,
+                "count": self.count,
+                "nlist": self.nlist,
+                "trained_count": self.trained_count,
+                "version": self.version,
+            }, f)
+        os.replace(tmp_path, self._meta_path)
+
+    def _refresh(self) -> None:
+        """
+        Reload if another process (or this one) has written since the last read
+        """
+        if not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path) as f:
+            meta = json.load(f)
+        if meta["version"] == self.version:
+            return
+
+        self.dim = meta["dim"]
+        self.dtype = np.dtype(meta["dtype"])
+        self.count = meta["count"]
+        self.nlist = meta["nlist"]
+        self.trained_count = meta["trained_count"]
+        self.version = meta["version"]
+        if self.count:
+            self._open_arrays(self.count)
+        self._centroids = np.load(self._centroids_path) if self.trained_count else None
+        self._rebuild_lists()
+
+    def _rebuild_lists(self) -> None:
+        if self._centroids is None or not self.count:
+            self._lists = []
+            return
+        assigned = np.asarray(self._list_ids[:self.count])
+        order = np.argsort(assigned, kind="stable")
+        bounds = np.searchsorted(assigned[order], np.arange(len(self._centroids) + 1))
+        self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self._centroids))]
+
+    # -----------------------------------------------------
+    # training
+    # -----------------------------------------------------
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        out = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), _SEARCH_BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + _SEARCH_BLOCK_ROWS], dtype=np.float32)
+            out[start:start + len(block)] = np.argmax(block @ self._centroids.T, axis=1)
+        return out
+
+    def _train(self) -> None:
+        live_rows = np.flatnonzero(self._live[:self.count])
+        nlist = min(self.nlist, len(live_rows))
+        rng = np.random.default_rng(0)
+        sample_rows = rng.choice(live_rows, size=min(len(live_rows), nlist * _KMEANS_SAMPLES_PER_LIST), replace=False)
+        sample = np.asarray(self._vectors[np.sort(sample_rows)], dtype=np.float32)
+
+        # Spherical k-means: centroids stay unit length so argmax of the dot
+        # product is the nearest centroid by cosine
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(_KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.bincount(labels, minlength=nlist) == 0
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = sums / np.clip(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12, None)
+
+        self._centroids = centroids.astype(np.float32)
+        np.save(self._centroids_path, self._centroids)
+        self._list_ids[:self.count] = self._assign(self._vectors[:self.count])
+        self._list_ids.flush()
+        self.trained_count = len(live_rows)
+        logger.info(f"Trained IVF index {self.directory}: {nlist} lists over {len(live_rows)} vectors")
+
+    def _needs_training(self, live: int) -> bool:
+        if not self.trained:
+            return live >= self.nlist * _KMEANS_SAMPLES_PER_LIST // 2
+        return live >= self.trained_count * _RETRAIN_GROWTH
+
+    # -----------------------------------------------------
+    # public API
+    # -----------------------------------------------------
+    def add(self, vectors: np.ndarray, live: bool = True) -> List[int]:
+        """
+        Append vectors and return their row numbers. With live=False the
+        rows are not searchable until they are passed to set_live().
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(vectors):
+            return []
+        vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+        with self._lock, self._file_lock():
+            self._refresh()
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+
+            start = self.count
+            self._open_arrays(start + len(vectors))
+            self._vectors[start:start + len(vectors)] = vectors.astype(self.dtype)
+            self._list_ids[start:start + len(vectors)] = self._assign(vectors) if self.trained else -1
+            self._live[start:start + len(vectors)] = 1 if live else 0
+            for array in (self._vectors, self._list_ids, self._live):
+                array.flush()
+            self.count = start + len(vectors)
+
+            self._train_if_needed()
+            self._write_meta()
+            self._rebuild_lists()
+            return list(range(start, self.count))
+
+    def _train_if_needed(self) -> None:
+        if self._needs_training(int(self._live[:self.count].sum())):
+            self._train()
+
+    def set_live(self, rows: List[int]) -> int:
+        """
+        Make rows added with live=False searchable. Rows that are already
+        live are left alone, so this is safe to repeat; returns how many
+        rows changed.
+        """
+        if not rows:
+            return 0
+        with self._lock, self._file_lock():
+            self._refresh()
+            rows = np.asarray([r for r in rows if 0 <= r < self.count], dtype=np.int64)
+            rows = rows[self._live[rows] == 0] if len(rows) else rows
+            if not len(rows):
+                return 0
+            self._live[rows] = 1
+            self._live.flush()
+            self._train_if_needed()
+            self._write_meta()
+            self._rebuild_lists()
+            return len(rows)
+
+    def delete(self, rows: List[int]) -> None:
+        if not rows:
+            return
+        with self._lock, self._file_lock():
+            self._refresh()
+            rows = np.asarray([r for r in rows if 0 <= r < self.count], dtype=np.int64)
+            if not len(rows):
+                return
+            self._live[rows] = 0
+            self._live.flush()
+            self._write_meta()
+
+    def search(self, query: np.ndarray, k: int, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Up to k (rows, cosine similarities) closest to query, best first
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+        with self._lock:
+            self._refresh()
+            if not self.count:
+                return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+            if self.trained:
+                probe = np.argsort(-(self._centroids @ query))[:nprobe or self.nprobe]
+                candidates = np.sort(np.concatenate([self._lists[i] for i in probe]))
+            else:
+                candidates = np.arange(self.count)
+            candidates = candidates[self._live[candidates] == 1]
+
+            rows, scores = [], []
+            for start in range(0, len(candidates), _SEARCH_BLOCK_ROWS):
+                block = candidates[start:start + _SEARCH_BLOCK_ROWS]
+                sims = np.asarray(self._vectors[block], dtype=np.float32) @ query
+                keep = np.argpartition(-sims, min(k, len(sims)) - 1)[:k] if len(sims) > k else np.arange(len(sims))
+                rows.append(block[keep])
+                scores.append(sims[keep])
+
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        rows, scores = np.concatenate(rows), np.concatenate(scores)
+        order = np.argsort(-scores)[:k]
+        return rows[order], scores[order]
@@ -1,7 +1,251 @@
-from typing import Dict
+import json
+import os
+import queue
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 
-JD_STORE: Dict[str, dict] = {}
+from app.config import JD_STORE_BACKEND, JD_DB_PATH, JD_DB_POOL_SIZE
+
+
+# =========================================================
+# JD STORAGE BACKENDS
+# =========================================================
+class JDStore(ABC):
+    """
+    Storage interface for JD records. Records are plain dicts as built by
+    jd_service; changes to an existing record go through update() so that
+    concurrent changes are not lost.
+    """
+
+    @abstractmethod
+    def get(self, jd_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def save(self, jd: dict) -> None:
+        ...
+
+    @abstractmethod
+    def update(self, jd_id: str, mutate: Callable[[dict], None]) -> Optional[dict]:
+        """
+        Apply mutate to the stored record and save it atomically. Returns
+        the updated record, or None when jd_id does not exist.
+        """
+
+    @abstractmethod
+    def list(
+        self,
+        status: Optional[str] = None,
+        title: Optional[str] = None,
+        level: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        limit: Optional[int] = None
+    ) -> List[dict]:
+        """
+        JDs ordered by (created_at, jd_id). `after` is the (created_at
+        isoformat, jd_id) of the last item of the previous page.
+        """
+
+
+class DictJDStore(JDStore):
+    """
+    In-process store; data is lost on restart and not shared between workers
+    """
+
+    def __init__(self):
+        self._jds: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, jd_id: str) -> Optional[dict]:
+        return self._jds.get(jd_id)
+
+    def save(self, jd: dict) -> None:
+        with self._lock:
+            self._jds[jd["jd_id"]] = jd
+
+    def update(self, jd_id: str, mutate: Callable[[dict], None]) -> Optional[dict]:
+        with self._lock:
+            jd = self._jds.get(jd_id)
+            if jd is None:
+                return None
+            mutate(jd)
+            return jd
+
+    def list(
+        self,
+        status: Optional[str] = None,
+        title: Optional[str] = None,
+        level: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        limit: Optional[int] = None
+    ) -> List[dict]:
+        jds = sorted(self._jds.values(), key=lambda jd: (jd["created_at"].isoformat(), jd["jd_id"]))
+        if after:
+            jds = [jd for jd in jds if (jd["created_at"].isoformat(), jd["jd_id"]) > tuple(after)]
+        if status:
+            jds = [jd for jd in jds if jd["status"] == status]
+        if title:
+            jds = [jd for jd in jds if title.lower() in jd["fields"].get("title", "").lower()]
+        if level:
+            jds = [jd for jd in jds if jd["fields"].get("level", "").lower() == level.lower()]
+        return jds[:limit] if limit is not None else jds
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jds (
+    jd_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    title TEXT NOT NULL,
+    level TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jds_status ON jds(status);
+CREATE INDEX IF NOT EXISTS idx_jds_created_at ON jds(created_at);
+CREATE INDEX IF NOT EXISTS idx_jds_level ON jds(level COLLATE NOCASE);
+"""
+
+
+def _encode_datetime(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode_jd(data: str) -> dict:
+    jd = json.loads(data)
+    for key in ("created_at", "updated_at"):
+        jd[key] = datetime.fromisoformat(jd[key])
+    for version in jd.get("versions", []):
+        version["timestamp"] = datetime.fromisoformat(version["timestamp"])
+    return jd
+
+
+class SQLiteJDStore(JDStore):
+    """
+    Embedded SQLite store in WAL mode, so several uvicorn workers can share
+    one database file. The whole record is kept as JSON; the columns used
+    for filtering and ordering are also stored separately. status, level
+    and created_at are indexed; the title filter is a substring match and
+    scans the rows left by the other filters.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(max(1, pool_size)):
+            self._pool.put(self._connect())
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def get(self, jd_id: str) -> Optional[dict]:
+        with self._connection() as conn:
+            row = conn.execute("SELECT data FROM jds WHERE jd_id = ?", (jd_id,)).fetchone()
+        return _decode_jd(row[0]) if row else None
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, jd: dict) -> None:
+        data = json.dumps(jd, default=_encode_datetime)
+        conn.execute(
+            "INSERT INTO jds (jd_id, status, title, level, created_at, updated_at, data) VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(jd_id) DO UPDATE SET status = excluded.status, title = excluded.title, "
+            "level = excluded.level, updated_at = excluded.updated_at, data = excluded.data",
+            (
+                jd["jd_id"],
+                jd["status"],
+                jd["fields"].get("title", ""),
+                jd["fields"].get("level", "") or "",
+                _encode_datetime(jd["created_at"]),
+                _encode_datetime(jd["updated_at"]),
+                data,
+            )
+        )
+
+    def save(self, jd: dict) -> None:
+        with self._connection() as conn:
+            self._write(conn, jd)
+
+    def update(self, jd_id: str, mutate: Callable[[dict], None]) -> Optional[dict]:
+        with self._connection() as conn:
+            # Take the write lock before reading, so no other writer can
+            # change the record between the read and the write
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT data FROM jds WHERE jd_id = ?", (jd_id,)).fetchone()
+                if row is None:
+                    conn.execute("ROLLBACK")
+                    return None
+                jd = _decode_jd(row[0])
+                mutate(jd)
+                self._write(conn, jd)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return jd
+
+    def list(
+        self,
+        status: Optional[str] = None,
+        title: Optional[str] = None,
+        level: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        limit: Optional[int] = None
+    ) -> List[dict]:
+        clauses, params = [], []
+        if after:
+            clauses.append("(created_at > ? OR (created_at = ? AND jd_id > ?))")
+            params.extend([after[0], after[0], after[1]])
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if title:
+            # Escape LIKE wildcards so the term matches literally, as in DictJDStore
+            escaped = title.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            clauses.append("title LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        if level:
+            clauses.append("level = ? COLLATE NOCASE")
+            params.append(level)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        limit_sql = ""
+        if limit is not None:
+            limit_sql = "LIMIT ?"
+            params.append(limit)
+        with self._connection() as conn:
+            rows = conn.execute(f"SELECT data FROM jds {where} ORDER BY created_at, jd_id {limit_sql}", params).fetchall()
+        return [_decode_jd(row[0]) for row in rows]
+
+
+def get_jd_store() -> JDStore:
+    if JD_STORE_BACKEND == "memory":
+        return DictJDStore()
+    if JD_STORE_BACKEND == "sqlite":
+        return SQLiteJDStore(JD_DB_PATH, JD_DB_POOL_SIZE)
+    raise RuntimeError(f"Unknown JD_STORE_BACKEND: {JD_STORE_BACKEND}")
+
+
+JD_STORE: JDStore = get_jd_store()
 
 JD_TEMPLATES = {
     "Software Engineer": {
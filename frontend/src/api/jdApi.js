@@ -30,8 +30,20 @@ export const extractFromFile = (file) => {
 export const getTemplates = () =>
   API.get("/jd/templates");
 
-export const listJDs = () =>
-  API.get("/jd/list");
+export const listJDs = (params = {}) =>
+  API.get("/jd/list", { params });
+
+// Follows the X-Next-Cursor header until the last page and returns every JD
+export const listAllJDs = async (params = {}) => {
+  const jds = [];
+  let cursor = null;
+  do {
+    const res = await listJDs(cursor ? { ...params, cursor } : params);
+    jds.push(...res.data);
+    cursor = res.headers["x-next-cursor"];
+  } while (cursor);
+  return jds;
+};
 
 export const getJD = (jdId) =>
   API.get(`/jd/${jdId}`);
@@ -41,3 +53,17 @@ export const updateJDText = (jdId, jdText) =>
 
 export const rankResumes = (jdId, driveUrl) =>
   API.post("/jd/rank-resumes", { jd_id: jdId, drive_folder_url: driveUrl });
+
+export const submitRankingJob = (jdId, driveUrl) =>
+  API.post("/jd/rank-resumes/jobs", { jd_id: jdId, drive_folder_url: driveUrl });
+
+export const getRankingJob = (jobId) =>
+  API.get(`/jd/rank-resumes/jobs/${jobId}`);
+
+export const getRankingJobResult = (jobId) =>
+  API.get(`/jd/rank-resumes/jobs/${jobId}/result`);
+
+export const streamRankResumes = (jdId, driveUrl) => {
+  const params = new URLSearchParams({ jd_id: jdId, drive_folder_url: driveUrl });
+  return new EventSource(`${API.defaults.baseURL}/jd/rank-resumes/stream?${params}`);
+};
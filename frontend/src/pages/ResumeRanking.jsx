@@ -1,5 +1,5 @@
-import React, { useState, useEffect } from 'react';
-import { listJDs, rankResumes } from '../api/jdApi';
+import React, { useState, useEffect, useRef } from 'react';
+import { listAllJDs, streamRankResumes } from '../api/jdApi';
 
 const ResumeRanking = () => {
   const [jds, setJds] = useState([]);
@@ -8,15 +8,18 @@ const ResumeRanking = () => {
   const [rankingResults, setRankingResults] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
+  const [progress, setProgress] = useState(null);
+  const [liveScores, setLiveScores] = useState([]);
+  const streamRef = useRef(null);
 
   useEffect(() => {
     loadJDs();
+    return () => streamRef.current?.close();
   }, []);
 
   const loadJDs = async () => {
     try {
-      const res = await listJDs();
-      setJds(res.data);
+      setJds(await listAllJDs({ fields: 'jd_id,fields.title', limit: 200 }));
     } catch (err) {
       setError('Failed to load JDs');
     }
@@ -31,15 +34,45 @@ const ResumeRanking = () => {
     setLoading(true);
     setError('');
     setRankingResults(null);
+    setProgress(null);
+    setLiveScores([]);
+    streamRef.current?.close();
 
-    try {
-      const results = await rankResumes(selectedJd, driveUrl);
-      setRankingResults(results.data);
-    } catch (err) {
-      setError(err.response?.data?.detail || err.message || 'Failed to rank resumes');
-    } finally {
+    const stream = streamRankResumes(selectedJd, driveUrl);
+    streamRef.current = stream;
+
+    const finish = () => {
+      stream.close();
+      streamRef.current = null;
       setLoading(false);
-    }
+    };
+
+    ['listed', 'downloaded', 'extracted'].forEach((eventName) => {
+      stream.addEventListener(eventName, (e) => {
+        const data = JSON.parse(e.data);
+        setProgress((prev) => ({ ...prev, ...data, stage: eventName }));
+      });
+    });
+
+    stream.addEventListener('scored', (e) => {
+      const data = JSON.parse(e.data);
+      setProgress((prev) => ({ ...prev, scored: data.scored, total: data.total, stage: 'scored' }));
+      setLiveScores((prev) =>
+        [...prev, data].sort((a, b) => b.bi_score - a.bi_score)
+      );
+    });
+
+    stream.addEventListener('result', (e) => {
+      setRankingResults(JSON.parse(e.data));
+      finish();
+    });
+
+    stream.addEventListener('error', (e) => {
+      // Server-sent "error" events carry a payload; transport errors do not
+      const detail = e.data ? JSON.parse(e.data).detail : 'Failed to rank resumes';
+      setError(detail);
+      finish();
+    });
   };
 
   return (
@@ -92,6 +125,37 @@ const ResumeRanking = () => {
         </div>
       )}
 
+      {loading && progress && (
+        <div className="bg-white p-6 rounded-lg shadow-md mb-6">
+          <h2 className="text-xl font-semibold mb-4">Ranking in Progress</h2>
+          <p className="mb-4 text-sm text-gray-600">
+            Downloaded {progress.downloaded || 0} / {progress.total || 0}
+            {' · '}Extracted {progress.extracted || 0}
+            {' · '}Scored {progress.scored || 0}
+          </p>
+          {liveScores.length > 0 && (
+            <table className="w-full border-collapse">
+              <thead>
+                <tr className="bg-gray-50">
+                  <th className="p-3 text-left font-semibold border-b">Resume Name</th>
+                  <th className="p-3 text-left font-semibold border-b">Candidate</th>
+                  <th className="p-3 text-left font-semibold border-b">Preliminary Score</th>
+                </tr>
+              </thead>
+              <tbody>
+                {liveScores.map((item) => (
+                  <tr key={item.name} className="border-b">
+                    <td className="p-3">{item.name}</td>
+                    <td className="p-3">{item.candidate_name}</td>
+                    <td className="p-3">{(item.bi_score * 100).toFixed(1)}%</td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          )}
+        </div>
+      )}
+
       {rankingResults && (
         <div className="bg-white p-6 rounded-lg shadow-md">
           <h2 className="text-xl font-semibold mb-4">Ranking Results</h2>
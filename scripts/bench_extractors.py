@@ -0,0 +1,61 @@
+"""
+Micro-benchmark for app.services.resume_extractors.extract_profile on
+synthetic resumes: cold (unmemoized) and memoized time per resume.
+
+    python scripts/bench_extractors.py [--count 500] [--seed 7]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.resume_extractors import UNKNOWN_CANDIDATE, clear_profile_cache, extract_profile  # noqa: E402
+
+
+def synthetic_resume(index: int, rng: random.Random) -> str:
+    first = rng.choice(["Asha", "John", "Maria", "Wei", "Olu", "Priya", "Lucas"])
+    last = rng.choice(["Patel", "Smith", "Garcia", "Chen", "Okafor", "Iyer", "Silva"])
+    skills = ", ".join(rng.sample(["Python", "Java", "SQL", "React", "Docker", "AWS", "Selenium", "Jira"], 4))
+    filler = " ".join(rng.choice(["built", "led", "designed", "tested", "shipped", "services", "pipelines", "teams"])
+                      for _ in range(rng.randint(400, 1500)))
+    return (
+        f"{first} {last}\n"
+        f"Email: {first.lower()}.{last.lower()}{index}@example.com | Phone: +1 555 0100\n"
+        f"Summary\nSoftware professional with {rng.randint(1, 15)} years of experience in {skills}.\n"
+        f"Experience\n{filler}\n"
+        f"Skills\n{skills}\n"
+    )
+
+
+def benchmark(count: int = 500, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    corpus = [synthetic_resume(i, rng) for i in range(count)]
+
+    clear_profile_cache()
+    start = time.perf_counter()
+    for text in corpus:
+        extract_profile(text)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(3):
+        for text in corpus:
+            extract_profile(text)
+    warm = (time.perf_counter() - start) / 3
+
+    unknown = sum(1 for text in corpus if extract_profile(text).candidate_name == UNKNOWN_CANDIDATE)
+    print(f"{count} synthetic resumes, avg {sum(map(len, corpus)) // count} chars")
+    print(f"cold: {cold * 1e6 / count:.1f} us/resume")
+    print(f"memoized: {warm * 1e6 / count:.1f} us/resume")
+    print(f"unnamed: {unknown}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark resume field extraction")
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    benchmark(args.count, args.seed)
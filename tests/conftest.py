@@ -0,0 +1,10 @@
+import os
+import tempfile
+
+# app.config requires an API key and writes caches and databases under
+# these directories; point them at a scratch directory before any app
+# module is imported
+_scratch = tempfile.mkdtemp(prefix="jd-tests-")
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("CACHE_DIR", os.path.join(_scratch, "cache"))
+os.environ.setdefault("DATA_DIR", os.path.join(_scratch, "data"))
@@ -0,0 +1,147 @@
+import hashlib
+import os
+import threading
+from collections import defaultdict
+
+import httplib2
+import pytest
+from googleapiclient.http import HttpRequest
+
+from app.services import resume_ranker
+from app.services.resume_ranker import drive_folder_lock, iter_pdfs_from_drive, list_drive_pdfs
+
+
+class FakeHttp:
+    """
+    Serves one Drive file's bytes to MediaIoBaseDownload, answering 503
+    for as long as the fake service says the file is still failing
+    """
+
+    def __init__(self, drive: "FakeDrive", file_id: str):
+        self._drive = drive
+        self._file_id = file_id
+
+    def request(self, uri, method="GET", headers=None, **kwargs):
+        if self._drive.take_failure(self._file_id):
+            return httplib2.Response({"status": "503"}), b""
+        content = self._drive.contents[self._file_id]
+        return httplib2.Response({"status": "200", "content-length": str(len(content))}), content
+
+
+class FakeDrive:
+    """
+    In-memory stand-in for the Drive v3 service: files().list pages
+    through the folder page_size files at a time, and get_media fails the
+    first failures[file_id] times a file is fetched
+    """
+
+    def __init__(self, files, page_size=2):
+        self.contents = {}
+        self.metadata = []
+        self.page_size = page_size
+        self.failures = defaultdict(int)
+        self.list_calls = []
+        self.media_calls = defaultdict(int)
+        self._lock = threading.Lock()
+        for file_id, content in files.items():
+            self.put(file_id, content)
+
+    def put(self, file_id, content, modified="2024-01-01T00:00:00Z"):
+        self.contents[file_id] = content
+        self.metadata = [f for f in self.metadata if f["id"] != file_id]
+        self.metadata.append({
+            "id": file_id,
+            "name": f"{file_id}.pdf",
+            "md5Checksum": hashlib.md5(content).hexdigest(),
+            "modifiedTime": modified,
+        })
+
+    def remove(self, file_id):
+        del self.contents[file_id]
+        self.metadata = [f for f in self.metadata if f["id"] != file_id]
+
+    def take_failure(self, file_id):
+        with self._lock:
+            if self.failures[file_id] > 0:
+                self.failures[file_id] -= 1
+                return True
+            return False
+
+    # files() resource
+    def files(self):
+        return self
+
+    def list(self, q, fields, pageSize, pageToken=None):
+        self.list_calls.append(pageToken)
+        start = int(pageToken or 0)
+        end = start + self.page_size
+        page = {"files": [dict(f) for f in self.metadata[start:end]]}
+        if end < len(self.metadata):
+            page["nextPageToken"] = str(end)
+        return _Executable(page)
+
+    def get_media(self, fileId):
+        with self._lock:
+            self.media_calls[fileId] += 1
+        uri = f"https://drive.invalid/files/{fileId}?alt=media"
+        return HttpRequest(FakeHttp(self, fileId), lambda resp, content: content, uri)
+
+
+class _Executable:
+    def __init__(self, result):
+        self._result = result
+
+    def execute(self):
+        return self._result
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(resume_ranker, "_retry_delay", lambda attempt: 0)
+
+
+def _sync(drive, folder_id, **kwargs):
+    with drive_folder_lock(folder_id):
+        return {name: open(path, "rb").read() for name, path in iter_pdfs_from_drive(drive, folder_id, **kwargs)}
+
+
+def test_list_follows_next_page_token():
+    drive = FakeDrive({f"f{i}": b"pdf" for i in range(5)}, page_size=2)
+    files = list_drive_pdfs(drive, "folder")
+    assert [f["id"] for f in files] == ["f0", "f1", "f2", "f3", "f4"]
+    assert drive.list_calls == [None, "2", "4"]
+
+
+def test_transient_failures_are_retried_per_file():
+    drive = FakeDrive({"ok": b"one", "flaky": b"two", "dead": b"three"})
+    drive.failures["flaky"] = 2
+    drive.failures["dead"] = 10
+
+    synced = _sync(drive, "retry-folder", max_retries=3, max_workers=2)
+
+    assert synced == {"ok.pdf": b"one", "flaky.pdf": b"two"}
+    assert drive.media_calls == {"ok": 1, "flaky": 3, "dead": 3}
+    blobs = os.listdir(os.path.join(resume_ranker._folder_cache_dir("retry-folder"), "blobs"))
+    assert sorted(blobs) == ["flaky.pdf", "ok.pdf"]  # no tmp files from failed attempts
+
+
+def test_manifest_only_downloads_changed_files_and_drops_stale_blobs():
+    folder_id = "incremental-folder"
+    drive = FakeDrive({"a": b"a1", "b": b"b1", "c": b"c1"})
+    assert _sync(drive, folder_id) == {"a.pdf": b"a1", "b.pdf": b"b1", "c.pdf": b"c1"}
+
+    drive.media_calls.clear()
+    drive.put("b", b"b2", modified="2024-02-01T00:00:00Z")
+    drive.remove("c")
+    drive.put("d", b"d1")
+
+    assert _sync(drive, folder_id) == {"a.pdf": b"a1", "b.pdf": b"b2", "d.pdf": b"d1"}
+    assert dict(drive.media_calls) == {"b": 1, "d": 1}
+
+    blob_dir = os.path.join(resume_ranker._folder_cache_dir(folder_id), "blobs")
+    assert sorted(os.listdir(blob_dir)) == ["a.pdf", "b.pdf", "d.pdf"]
+    assert sorted(resume_ranker._load_manifest(folder_id)) == ["a", "b", "d"]
+
+    drive.media_calls.clear()
+    assert _sync(drive, folder_id) == {"a.pdf": b"a1", "b.pdf": b"b2", "d.pdf": b"d1"}
+    assert not drive.media_calls
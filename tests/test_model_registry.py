@@ -0,0 +1,55 @@
+import logging
+
+import pytest
+
+from app.services import model_registry, onnx_backend
+
+
+class FakeModel:
+    def __init__(self, backend):
+        self.backend = backend
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    monkeypatch.setattr(model_registry, "_MODELS", {})
+    monkeypatch.setattr(model_registry, "_MODEL_STATS", {})
+    monkeypatch.setattr(model_registry, "_LOCKS", {})
+
+
+def _fail_onnx(kind, model_name):
+    raise ImportError("No module named 'onnxruntime'")
+
+
+def test_torch_backend_never_touches_onnx(monkeypatch):
+    monkeypatch.setattr(model_registry, "INFERENCE_BACKEND", "torch")
+    monkeypatch.setattr(onnx_backend, "load_onnx_model", lambda kind, name: pytest.fail("ONNX loader called"))
+    model = model_registry._load_for_backend("bi", "tiny", lambda: FakeModel("torch"))
+    assert model.backend == "torch"
+
+
+def test_onnx_backend_is_loaded_once_and_recorded(monkeypatch):
+    calls = []
+
+    def load_onnx(kind, model_name):
+        calls.append((kind, model_name))
+        return FakeModel("onnx")
+
+    monkeypatch.setattr(model_registry, "INFERENCE_BACKEND", "onnx")
+    monkeypatch.setattr(onnx_backend, "load_onnx_model", load_onnx)
+
+    first = model_registry.get_cross_model("tiny-cross")
+    assert model_registry.get_cross_model("tiny-cross") is first
+    assert calls == [("cross", "tiny-cross")]
+    assert model_registry.get_model_stats()["models"]["cross:tiny-cross"]["backend"] == "onnx"
+
+
+def test_onnx_failure_falls_back_to_sentence_transformers(monkeypatch, caplog):
+    monkeypatch.setattr(model_registry, "INFERENCE_BACKEND", "onnx")
+    monkeypatch.setattr(onnx_backend, "load_onnx_model", _fail_onnx)
+
+    with caplog.at_level(logging.WARNING, logger=model_registry.__name__):
+        model = model_registry._load_for_backend("bi", "tiny", lambda: FakeModel("torch"))
+
+    assert model.backend == "torch"
+    assert "ONNX backend unavailable for tiny" in caplog.text
@@ -0,0 +1,14 @@
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("sentence_transformers")
+
+from app.services.onnx_backend import parity_report  # noqa: E402
+
+
+def test_int8_models_match_sentence_transformers():
+    report = parity_report()
+    assert report["embedding_cosine_min"] >= 0.98, report
+    assert report["bi_score_spearman"] >= 0.9, report
+    assert report["cross_score_spearman"] >= 0.9, report
+    assert report["passed"], report
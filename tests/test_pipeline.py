@@ -0,0 +1,66 @@
+import itertools
+import threading
+import time
+
+import pytest
+
+from app.services.pipeline import Pipeline, PipelineCancelled
+
+
+def _pipeline_threads():
+    return [t for t in threading.enumerate() if t.name.startswith("pipeline-")]
+
+
+def test_results_in_completion_order_and_items_dropped_on_none():
+    pipeline = (
+        Pipeline(range(10))
+        .stage("double", lambda x: x * 2, workers=3)
+        .stage("odd", lambda x: None if x % 4 else x, workers=2)
+    )
+    assert sorted(pipeline.results()) == [0, 4, 8, 12, 16]
+    assert not _pipeline_threads()
+
+
+def test_cancel_mid_run_stops_every_thread_and_closes_the_source():
+    cancel = threading.Event()
+    closed = threading.Event()
+
+    def source():
+        try:
+            for i in itertools.count():
+                yield i
+        finally:
+            closed.set()
+
+    def slow(x):
+        time.sleep(0.01)
+        return x
+
+    pipeline = Pipeline(source(), cancel=cancel).stage("slow", slow, workers=2)
+    received = 0
+    with pytest.raises(PipelineCancelled):
+        for _ in pipeline.results():
+            received += 1
+            if received == 5:
+                cancel.set()
+
+    assert closed.is_set()
+    assert not _pipeline_threads()
+
+
+def test_stage_error_is_raised_after_threads_exit():
+    def boom(x):
+        if x == 3:
+            raise ValueError("bad item")
+        return x
+
+    with pytest.raises(ValueError, match="bad item"):
+        list(Pipeline(range(100)).stage("boom", boom, workers=2).results())
+    assert not _pipeline_threads()
+
+
+def test_consumer_stopping_early_joins_threads():
+    results = Pipeline(itertools.count()).stage("same", lambda x: x, workers=2).results()
+    next(results)
+    results.close()
+    assert not _pipeline_threads()
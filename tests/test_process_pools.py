@@ -0,0 +1,26 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.services.process_pools import terminate_pool
+
+
+def test_terminate_pool_kills_a_hung_worker_and_fails_its_tasks():
+    pool = ProcessPoolExecutor(max_workers=1)
+    hung = pool.submit(time.sleep, 600)
+    queued = pool.submit(time.sleep, 0)
+    while not hung.running():
+        time.sleep(0.01)
+    processes = list(pool._processes.values())
+
+    terminate_pool(pool)
+
+    for process in processes:
+        process.join(timeout=10)
+        assert not process.is_alive()
+    with pytest.raises(BrokenProcessPool):
+        hung.result(timeout=10)
+    with pytest.raises(BrokenProcessPool):
+        queued.result(timeout=10)
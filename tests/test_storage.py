@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.storage import DictJDStore, SQLiteJDStore
+
+_TITLES = ["100% Remote Engineer", "1000 Remote Engineer", "QA_Lead", "QA Lead", "C:\\Ops Admin", "C:Ops Admin"]
+
+
+@pytest.fixture(params=["dict", "sqlite"])
+def store(request, tmp_path):
+    store = DictJDStore() if request.param == "dict" else SQLiteJDStore(str(tmp_path / "jds.db"))
+    start = datetime(2024, 1, 1)
+    for i, title in enumerate(_TITLES):
+        created = start + timedelta(minutes=i)
+        store.save({
+            "jd_id": f"jd-{i}",
+            "status": "draft",
+            "fields": {"title": title, "level": "Mid"},
+            "created_at": created,
+            "updated_at": created,
+        })
+    return store
+
+
+@pytest.mark.parametrize("term, expected", [
+    ("0%", ["100% Remote Engineer"]),
+    ("a_l", ["QA_Lead"]),
+    ("c:\\", ["C:\\Ops Admin"]),
+    ("remote", ["100% Remote Engineer", "1000 Remote Engineer"]),
+])
+def test_title_filter_is_a_literal_case_insensitive_substring_match(store, term, expected):
+    assert [jd["fields"]["title"] for jd in store.list(title=term)] == expected
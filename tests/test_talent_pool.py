@@ -0,0 +1,65 @@
+import threading
+
+import numpy as np
+import pytest
+
+from app.services import talent_pool
+from app.services.vector_index import IVFIndex
+
+_DIM = 8
+
+
+def _fake_encode(model, store_name, texts, **kwargs):
+    # Deterministic unit-ish vectors per text, so no model is needed
+    return np.stack([np.random.default_rng(abs(hash(text)) % 2 ** 32).standard_normal(_DIM) for text in texts])
+
+
+@pytest.fixture(autouse=True)
+def pool(monkeypatch, tmp_path):
+    monkeypatch.setattr(talent_pool, "TALENT_POOL_DB_PATH", str(tmp_path / "pool.db"))
+    monkeypatch.setattr(talent_pool, "TALENT_POOL_INDEX_DIR", str(tmp_path / "index"))
+    monkeypatch.setattr(talent_pool, "_local", threading.local())
+    monkeypatch.setattr(talent_pool, "_index", None)
+    monkeypatch.setattr(talent_pool, "get_embed_model", lambda: None)
+    monkeypatch.setattr(talent_pool, "embed_store_name", lambda model: "fake-model")
+    monkeypatch.setattr(talent_pool, "encode_with_store", _fake_encode)
+    # PDF "bytes" here are already the resume text
+    monkeypatch.setattr(
+        talent_pool, "iter_extracted_resumes",
+        lambda resumes: ((name, data.decode()) for name, data in resumes.items())
+    )
+
+
+def _resume(skill):
+    return f"Jane Doe\nSkills: Python, {skill}, SQL\nExperience: 5 years building {skill} services".encode()
+
+
+def test_same_name_different_files_are_both_ingested_and_same_file_once():
+    result = talent_pool.ingest_resumes([
+        ("resume.pdf", _resume("Django")),
+        ("resume.pdf", _resume("Kafka")),
+        ("copy.pdf", _resume("Django")),
+    ])
+    assert result["ingested"] == 2 and result["skipped"] == 1
+    assert talent_pool.get_pool_stats()["resumes"] == 2
+
+    again = talent_pool.ingest_resumes({"other-name.pdf": _resume("Kafka")})
+    assert again == {"ingested": 0, "skipped": 1, "resume_ids": []}
+
+
+def test_vectors_are_hidden_until_committed_and_published_after_a_crash(monkeypatch):
+    def crash(self, rows):
+        raise SystemExit("killed between commit and publish")
+
+    talent_pool._get_index()
+    with monkeypatch.context() as patch:
+        patch.setattr(IVFIndex, "set_live", crash)
+        with pytest.raises(SystemExit):
+            talent_pool.ingest_resumes({"a.pdf": _resume("Go")})
+        index = talent_pool._get_index()
+        assert index.count > 0 and index.live_count() == 0
+
+    # A fresh process opening the pool publishes the committed rows
+    monkeypatch.setattr(talent_pool, "_index", None)
+    assert talent_pool._get_index().live_count() == index.count
+    assert talent_pool.get_pool_stats()["resumes"] == 1
@@ -0,0 +1,69 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI, File, UploadFile
+
+from app.services.jd_documents import UploadSizeLimit, _MULTIPART_OVERHEAD
+
+_MAX_BYTES = 1024 * 1024
+
+
+def _app(calls):
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimit, paths=("/upload",), max_bytes=_MAX_BYTES)
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        calls.append(file.filename)
+        return {"size": len(await file.read())}
+
+    return app
+
+
+def _post(app, **kwargs):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/upload", **kwargs)
+    return asyncio.run(run())
+
+
+def _multipart(size):
+    boundary = "limit-test"
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"jd.pdf\"\r\n"
+        f"Content-Type: application/pdf\r\n\r\n"
+    ).encode() + b"x" * size + f"\r\n--{boundary}--\r\n".encode()
+    return body, {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+
+def test_upload_within_limit_reaches_the_route():
+    calls = []
+    response = _post(_app(calls), files={"file": ("jd.pdf", b"x" * 1000)})
+    assert response.status_code == 200 and response.json() == {"size": 1000}
+    assert calls == ["jd.pdf"]
+
+
+def test_oversized_content_length_is_rejected_before_the_body_is_read():
+    calls = []
+    body, headers = _multipart(_MAX_BYTES + _MULTIPART_OVERHEAD)
+    response = _post(_app(calls), content=body, headers=headers)
+    assert response.status_code == 413
+    assert response.json() == {"detail": "File is larger than 1 MB"}
+    assert calls == []
+
+
+def test_streamed_body_is_cut_off_once_it_passes_the_limit():
+    calls = []
+    body, headers = _multipart(2 * _MAX_BYTES)
+    sent = []
+
+    async def chunks():
+        for start in range(0, len(body), 64 * 1024):
+            sent.append(start)
+            yield body[start:start + 64 * 1024]
+
+    response = _post(_app(calls), content=chunks(), headers=headers)
+    assert response.status_code == 413
+    assert calls == []
+    assert len(sent) < len(range(0, len(body), 64 * 1024))  # the rest was never read